@@ -1,20 +1,52 @@
 """
 Erg Screen Reader - A tool for extracting structured workout data from rowing ergometer screen images.
+
+Public names are imported lazily (PEP 562) so importing the package doesn't pull
+in OpenAI, openpyxl or the Google API client until they are actually used.
 """
 
-from erg_screen_reader.core import ErgScreenReader
-from erg_screen_reader.google_sheets_service import GoogleSheetsService
-from erg_screen_reader.models import Summary, Split, IntervalSummary, Interval, ReceiptDetails, IntervalReceiptDetails
+import importlib
+from typing import Any, List
 
 __version__ = "0.1.0"
 
+# Public name -> module that defines it
+_LAZY_IMPORTS = {
+    'ErgScreenReader': 'erg_screen_reader.core',
+    'GoogleSheetsService': 'erg_screen_reader.google_sheets_service',
+    'AsyncGoogleSheetsService': 'erg_screen_reader.google_sheets_service',
+    'Summary': 'erg_screen_reader.models',
+    'Split': 'erg_screen_reader.models',
+    'IntervalSummary': 'erg_screen_reader.models',
+    'Interval': 'erg_screen_reader.models',
+    'ReceiptDetails': 'erg_screen_reader.models',
+    'IntervalReceiptDetails': 'erg_screen_reader.models',
+}
+
 __all__ = [
     'ErgScreenReader',
     'GoogleSheetsService', 
+    'AsyncGoogleSheetsService',
     'Summary',
     'Split',
     'IntervalSummary',
     'Interval',
     'ReceiptDetails',
     'IntervalReceiptDetails'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """Include lazily imported names in dir()."""
+    return sorted(set(globals()) | set(__all__))
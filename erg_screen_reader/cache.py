@@ -0,0 +1,69 @@
+"""
+On-disk cache for AI extraction results.
+
+Results are stored as JSON files keyed by a SHA-256 digest of the image bytes
+combined with the model, prompt version and output schema, so reprocessing the
+same image skips the OpenAI round-trip entirely. The OpenAI file ids of uploaded
+images are cached the same way so an image is only uploaded once.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Default cache location (override with ERG_CACHE_DIR)
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'erg_screen_reader'
+
+
+class ResultCache:
+    """Content-addressed store for serialized extraction results."""
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """Initialize the cache, defaulting to $ERG_CACHE_DIR or ~/.cache/erg_screen_reader/."""
+        # ERG_CACHE_DIR is read here rather than at import so a .env value applies
+        self.cache_dir = Path(cache_dir or os.getenv('ERG_CACHE_DIR') or DEFAULT_CACHE_DIR)
+
+    @staticmethod
+    def make_key(image_sha256: str, model: str, prompt_version: str, schema_name: str,
+                 preprocessing: str = "") -> str:
+        """Build a cache key from the image digest and everything that shapes the result."""
+        return _digest(image_sha256, model, prompt_version, schema_name, preprocessing)
+
+    @staticmethod
+    def make_upload_key(image_sha256: str, preprocessing: str = "") -> str:
+        """Build a cache key for the OpenAI file id of an uploaded image."""
+        return _digest("upload", image_sha256, preprocessing)
+
+    def _path(self, key: str) -> Path:
+        """Get the file path for a cache key."""
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for a key, or None on a miss."""
+        try:
+            return self._path(key).read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value for a key, writing atomically so readers never see partial files."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            # Unique per process and thread so concurrent writers never share a temp file
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(value, encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Caching is best-effort; never fail an extraction because of it
+            logger.warning("Could not write cache entry: %s", e)
+
+
+def _digest(*parts: str) -> str:
+    """SHA-256 of the parts joined with NUL separators, so ("ab", "c") and ("a", "bc") differ."""
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
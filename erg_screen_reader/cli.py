@@ -5,13 +5,118 @@ Command line interface for Erg Screen Reader.
 import argparse
 import asyncio
 import sys
-from pathlib import Path
+from typing import Any
 
-from erg_screen_reader.core import ErgScreenReader, validate_environment
-from erg_screen_reader.google_sheets_service import GoogleSheetsService
+from erg_screen_reader.core import EXCEL_WRITERS, ErgScreenReader, validate_environment
 
 
-async def main():
+async def process_image(reader: ErgScreenReader, image_path: str, workout_type: str,
+                        semaphore: asyncio.Semaphore, use_cache: bool = True, autocrop: bool = False) -> Any:
+    """Extract workout data from one image, bounded by the shared semaphore."""
+    async with semaphore:
+        if workout_type == "both":
+            # Both prompts run concurrently against one prepared (and uploaded) image
+            print(f"Processing regular and interval workout image: {image_path}")
+            return await reader.extract_all(image_path, use_cache=use_cache, autocrop=autocrop)
+        elif workout_type == "interval":
+            print(f"Processing interval workout image: {image_path}")
+            return await reader.extract_interval_workout_data_ai(image_path, use_cache=use_cache, autocrop=autocrop)
+        else:
+            print(f"Processing regular workout image: {image_path}")
+            return await reader.extract_workout_data_ai(image_path, use_cache=use_cache, autocrop=autocrop)
+
+
+def write_results(reader: ErgScreenReader, result: Any, args: argparse.Namespace) -> None:
+    """Write one image's result; with --workout-type both, the regular then the interval report."""
+    if args.workout_type == "both":
+        regular, interval = result
+        write_output(reader, regular, args, "regular")
+        write_output(reader, interval, args, "interval")
+    else:
+        write_output(reader, result, args, args.workout_type)
+
+
+def write_output(reader: ErgScreenReader, receipt_details: Any, args: argparse.Namespace, workout_type: str) -> None:
+    """Display extracted data and write it to Excel or Google Sheets."""
+    if workout_type == "interval":
+        summary = receipt_details.summary
+        intervals = receipt_details.intervals
+        
+        # Display extracted data
+        print(f"\nExtracted Interval Summary: {summary}")
+        print(f"Extracted Intervals: {intervals}")
+    else:
+        summary = receipt_details.summary
+        splits = receipt_details.splits
+        
+        # Display extracted data
+        print(f"\nExtracted Summary: {summary}")
+        print(f"Extracted Splits: {splits}")
+    
+    # Generate report based on output type
+    if args.sheets:
+        # Imported here so runs without --sheets never load the Google API client
+        from erg_screen_reader.google_sheets_service import GoogleSheetsService
+        
+        # Create Google Sheet
+        sheets_service = GoogleSheetsService()
+        sheet_name = args.sheet_name or sheets_service.generate_sheet_name(args.name)
+        
+        print(f"Creating Google Sheet: {sheet_name}")
+        rows = intervals if workout_type == "interval" else splits
+        spreadsheet_id = sheets_service.create_and_populate(
+            sheet_name, summary, rows, args.name, make_public=args.public
+        )
+        
+        sheet_url = sheets_service.get_spreadsheet_url(spreadsheet_id)
+        print(f"Google Sheet created successfully: {sheet_url}")
+    elif workout_type == "interval":
+        # Generate interval Excel report
+        reader.create_interval_excel_report(summary, intervals, args.output, args.name, args.writer)
+        print(f"Excel report created: {args.output}")
+    else:
+        # Generate Excel report
+        reader.create_excel_report(summary, splits, args.output, args.name, args.writer)
+        print(f"Excel report created: {args.output}")
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Process all images concurrently and write their reports. Returns the failure count."""
+    # Validate environment for AI processing
+    validate_environment()
+    
+    # A single reader shares one OpenAI client (and connection pool) across the batch
+    reader = ErgScreenReader()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    
+    tasks = [
+        asyncio.ensure_future(
+            process_image(reader, path, args.workout_type, semaphore, not args.no_cache, args.autocrop)
+        )
+        for path in args.image_path
+    ]
+    
+    # Reports are written one at a time in argument order (so appends to the same
+    # workbook don't race), on a worker thread while later extractions continue
+    failures = 0
+    try:
+        for image_path, task in zip(args.image_path, tasks):
+            try:
+                result = await task
+                await asyncio.to_thread(write_results, reader, result, args)
+            except Exception as e:
+                print(f"Error processing image {image_path}: {e}")
+                failures += 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await reader.aclose()
+    
+    return failures
+
+
+def main() -> None:
     """Main entry point for the CLI application."""
     # Parse command line arguments
     parser = argparse.ArgumentParser(
@@ -20,18 +125,25 @@ async def main():
         epilog="""
 Examples:
   %(prog)s erg.png                                    # Process regular workout
+  %(prog)s erg1.png erg2.png erg3.png                 # Process several images at once
   %(prog)s erg.png --workout-type interval            # Process interval workout
+  %(prog)s erg.png --workout-type both                # Regular and interval breakdowns
   %(prog)s erg.png --output my_workout.xlsx           # Custom output filename
+  %(prog)s erg.png --writer xlsxwriter                # Low-memory Excel writer
   %(prog)s erg.png --name "Jane Smith"                # Custom rower name
   %(prog)s erg.png --sheets                           # Create Google Sheet
   %(prog)s erg.png --sheets --sheet-name "Training"   # Custom Google Sheet name
+  %(prog)s erg.png --sheets --public                  # Share the sheet with anyone with the link
+  %(prog)s erg.png --no-cache                         # Ignore cached AI results
+  %(prog)s photo.jpg --autocrop                       # Crop a camera photo to the monitor
         """
     )
     
     parser.add_argument(
         "image_path",
         type=str,
-        help="Path to the ergometer screen image"
+        nargs="+",
+        help="Path(s) to the ergometer screen image(s)"
     )
     
     parser.add_argument(
@@ -44,9 +156,9 @@ Examples:
     parser.add_argument(
         "--workout-type",
         type=str,
-        choices=["regular", "interval"],
+        choices=["regular", "interval", "both"],
         default="regular",
-        help="Type of workout to process (default: regular)"
+        help="Type of workout to process; 'both' extracts and writes both breakdowns (default: regular)"
     )
     
     parser.add_argument(
@@ -68,74 +180,53 @@ Examples:
         help="Name for the Google Sheet (defaults to 'Erg Screen Reader <date/time>')"
     )
     
+    parser.add_argument(
+        "--public",
+        action="store_true",
+        help="Share the created Google Sheet with anyone who has the link (default: private)"
+    )
+    
+    parser.add_argument(
+        "--writer",
+        type=str,
+        choices=EXCEL_WRITERS,
+        default="openpyxl",
+        help="Excel writer; xlsxwriter streams rows in constant memory (default: openpyxl)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-run AI extraction even if a cached result exists for the image"
+    )
+    
+    parser.add_argument(
+        "--autocrop",
+        action="store_true",
+        help="Crop camera photos to the detected monitor screen before upload (needs the autocrop extra)"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Maximum number of images processed at once (default: 8)"
+    )
+    
     args = parser.parse_args()
     
-    # Initialize the reader
-    reader = ErgScreenReader()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
     
     try:
-        # Validate environment for AI processing
-        validate_environment()
-        
-        # Process the image based on workout type
-        if args.workout_type == "interval":
-            print(f"Processing interval workout image: {args.image_path}")
-            receipt_details = await reader.extract_interval_workout_data_ai(args.image_path)
-            
-            summary = receipt_details.summary
-            intervals = list(receipt_details.intervals)
-            
-            # Display extracted data
-            print(f"\nExtracted Interval Summary: {summary}")
-            print(f"Extracted Intervals: {intervals}")
-            
-            # Generate report based on output type
-            if args.sheets:
-                # Create Google Sheet
-                sheets_service = GoogleSheetsService()
-                sheet_name = args.sheet_name or sheets_service.generate_sheet_name(args.name)
-                
-                print(f"Creating Google Sheet: {sheet_name}")
-                spreadsheet_id = sheets_service.create_spreadsheet(sheet_name)
-                
-                sheet_url = sheets_service.get_spreadsheet_url(spreadsheet_id)
-                print(f"Google Sheet created successfully: {sheet_url}")
-            else:
-                # Generate interval Excel report
-                reader.create_interval_excel_report(summary, intervals, args.output, args.name)
-                print(f"Excel report created: {args.output}")
-            
-        else:  # Regular workout
-            print(f"Processing regular workout image: {args.image_path}")
-            receipt_details = await reader.extract_workout_data_ai(args.image_path)
-            
-            summary = receipt_details.summary
-            splits = list(receipt_details.splits)
-            
-            # Display extracted data
-            print(f"\nExtracted Summary: {summary}")
-            print(f"Extracted Splits: {splits}")
-            
-            # Generate report based on output type
-            if args.sheets:
-                # Create Google Sheet
-                sheets_service = GoogleSheetsService()
-                sheet_name = args.sheet_name or sheets_service.generate_sheet_name(args.name)
-                
-                print(f"Creating Google Sheet: {sheet_name}")
-                spreadsheet_id = sheets_service.create_spreadsheet(sheet_name)
-                
-                sheet_url = sheets_service.get_spreadsheet_url(spreadsheet_id)
-                print(f"Google Sheet created successfully: {sheet_url}")
-            else:
-                # Generate Excel report
-                reader.create_excel_report(summary, splits, args.output, args.name)
-                print(f"Excel report created: {args.output}")
-        
+        failures = asyncio.run(run(args))
     except Exception as e:
         print(f"Error processing image: {e}")
         sys.exit(1)
+    
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
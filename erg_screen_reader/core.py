@@ -5,22 +5,250 @@ A tool for extracting structured workout data from rowing ergometer screen image
 Supports AI-powered (OpenAI) image processing.
 """
 
-import base64
-import mimetypes
+import asyncio
+import binascii
+import functools
+import hashlib
+import io
+import logging
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 
-import pandas as pd
+import httpx
+import openpyxl
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, BadRequestError, DefaultAsyncHttpxClient, NotFoundError
+from openai.types.responses import ParsedResponse
+from openpyxl import Workbook
+from openpyxl.styles import Font
+from PIL import Image, ImageOps, UnidentifiedImageError
+from pydantic import BaseModel
 
-from erg_screen_reader.models import ReceiptDetails, IntervalReceiptDetails
-from erg_screen_reader.prompt_template import BASIC_PROMPT, INTERVAL_PROMPT
+try:
+    # SIMD-accelerated base64 when installed
+    from pybase64 import b64encode_as_string as _b64encode
+except ImportError:
+    def _b64encode(data: bytes) -> str:
+        """Base64-encode bytes to an ASCII string (no trailing newline)."""
+        return binascii.b2a_base64(data, newline=False).decode("ascii")
 
-# Load environment variables
+# Load environment variables from .env (variables already set take precedence);
+# done before the package modules below read their settings
 load_dotenv()
 
+from erg_screen_reader.cache import ResultCache
+from erg_screen_reader.models import ReceiptDetails, IntervalReceiptDetails
+from erg_screen_reader.prompt_template import BASIC_PROMPT, INTERVAL_PROMPT, PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Longest image edge sent to the vision model (its high-detail tile limit)
+MAX_IMAGE_EDGE = 1568
+JPEG_QUALITY = 85
+
+# Uploaded images expire from the OpenAI Files API after this long; a cached file
+# id that outlives its file is detected and the image re-uploaded
+UPLOAD_TTL_SECONDS = 7 * 24 * 3600
+
+# Most OpenAI requests one reader keeps in flight (bursts queue instead of hitting rate limits)
+MAX_CONCURRENT_REQUESTS = int(os.getenv('ERG_MAX_CONCURRENT_REQUESTS', '8'))
+
+# Screen autocrop: detection resolution and plausible screen size (fraction of image)
+AUTOCROP_DETECT_EDGE = 1000
+AUTOCROP_MIN_AREA = 0.15
+AUTOCROP_MAX_AREA = 0.95
+
+# Supported image extensions (images are re-encoded as JPEG, so only the format matters)
+_IMAGE_SUFFIXES = frozenset({'.png', '.jpg', '.jpeg', '.webp', '.gif', '.bmp', '.tif', '.tiff'})
+
+# Leading file signatures of the supported formats, for files without a usable extension
+_MAGIC = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+    (b'II*\x00', 'image/tiff'),
+    (b'MM\x00*', 'image/tiff'),
+)
+
+# Header style for report sheets
+HEADER_FONT = Font(bold=True)
+
+# Supported Excel writers; xlsxwriter streams rows in constant memory
+EXCEL_WRITERS = ('openpyxl', 'xlsxwriter')
+
+# (column header, field name) for each breakdown sheet
+SPLIT_KEYS = (
+    ('Split #', 'split_number'),
+    ('Distance (m)', 'split_distance'),
+    ('Time', 'split_time'),
+    ('Pace', 'split_pace'),
+    ('Rate (spm)', 'rate'),
+    ('HR', 'hr'),
+    ('Watts', 'watts'),
+)
+
+INTERVAL_KEYS = (
+    ('Interval #', 'interval_number'),
+    ('Distance (m)', 'interval_distance'),
+    ('Time', 'interval_time'),
+    ('Pace', 'interval_pace'),
+    ('Rate (spm)', 'rate'),
+    ('HR', 'hr'),
+    ('Watts', 'watts'),
+    ('Rest Time', 'rest_time'),
+)
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def _make_client() -> AsyncOpenAI:
+    """Create an AsyncOpenAI client with a keep-alive HTTP/2 connection pool."""
+    return AsyncOpenAI(
+        http_client=DefaultAsyncHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        )
+    )
+
+
+def _is_missing_file_error(error: Exception) -> bool:
+    """Whether an OpenAI error says a referenced file doesn't exist (as opposed to any other bad request)."""
+    if isinstance(error, NotFoundError):
+        return True
+    if not isinstance(error, BadRequestError):
+        return False
+    param = error.param or ''
+    body = error.body if isinstance(error.body, dict) else {}
+    message = str(body.get('message') or error.message).lower()
+    return param.endswith('file_id') or ('file' in message and 'not found' in message)
+
+
+def _get_field(row: Any, key: str) -> Any:
+    """Read a field from a Pydantic model or a plain dictionary."""
+    if isinstance(row, dict):
+        return row.get(key)
+    return getattr(row, key, None)
+
+
+def _autocrop_screen(img: Image.Image) -> Image.Image:
+    """
+    Crop a photo down to the erg monitor, if one can be found.
+    
+    Looks for the largest dark quadrilateral (the monitor housing around the
+    screen) and warps it to a flat rectangle, so wall and floor around the
+    monitor don't cost vision tiles. Returns the image unchanged when OpenCV
+    isn't installed or no plausible screen is detected.
+    """
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        return img
+    
+    rgb = np.asarray(img.convert("RGB"))
+    
+    # Detect on a small copy; warp from the full-resolution image
+    scale = min(1.0, AUTOCROP_DETECT_EDGE / max(rgb.shape[:2]))
+    small = cv2.resize(rgb, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else rgb
+    gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_RGB2GRAY), (5, 5), 0)
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    image_area = gray.shape[0] * gray.shape[1]
+    corners = None
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True):
+        area = cv2.contourArea(contour)
+        if area < AUTOCROP_MIN_AREA * image_area:
+            break
+        if area > AUTOCROP_MAX_AREA * image_area:
+            continue
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            corners = approx.reshape(4, 2).astype(np.float32) / scale
+            break
+    
+    if corners is None:
+        return img
+    
+    # Order corners: top-left, top-right, bottom-right, bottom-left
+    sums = corners.sum(axis=1)
+    diffs = np.diff(corners, axis=1).ravel()
+    top_left, bottom_right = corners[np.argmin(sums)], corners[np.argmax(sums)]
+    top_right, bottom_left = corners[np.argmin(diffs)], corners[np.argmax(diffs)]
+    
+    width = int(max(np.linalg.norm(top_right - top_left), np.linalg.norm(bottom_right - bottom_left)))
+    height = int(max(np.linalg.norm(bottom_left - top_left), np.linalg.norm(bottom_right - top_right)))
+    if width < 2 or height < 2:
+        return img
+    
+    src = np.array([top_left, top_right, bottom_right, bottom_left], dtype=np.float32)
+    dst = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    warped = cv2.warpPerspective(rgb, cv2.getPerspectiveTransform(src, dst), (width, height))
+    return Image.fromarray(warped)
+
+
+def _prepare_image(image_path: str, autocrop: bool = False) -> Tuple[bytes, str]:
+    """
+    Downscale and re-encode an image for upload.
+    
+    The vision model resizes large images internally, so anything beyond
+    MAX_IMAGE_EDGE pixels is wasted upload bandwidth.
+    
+    Args:
+        image_path: Path to the ergometer screen image
+        autocrop: Crop to the detected monitor screen first (needs OpenCV)
+        
+    Returns:
+        Tuple of (JPEG bytes, MIME type)
+        
+    Raises:
+        ValueError: If the image cannot be decoded
+    """
+    try:
+        with Image.open(image_path) as source:
+            # Apply EXIF rotation from phone cameras before the metadata is dropped
+            img = ImageOps.exif_transpose(source)
+            if autocrop:
+                img = _autocrop_screen(img)
+            if max(img.size) > MAX_IMAGE_EDGE:
+                img.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
+            
+            buffer = io.BytesIO()
+            img.convert("RGB").save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    except UnidentifiedImageError:
+        raise ValueError(f"Could not decode image: {image_path}")
+    
+    return buffer.getvalue(), "image/jpeg"
+
+
+@functools.lru_cache(maxsize=64)
+def _sniff_mime(image_path: str, mtime: int) -> Optional[str]:
+    """MIME type from the file's magic bytes (None if unrecognised), cached by path and modification time."""
+    with open(image_path, 'rb') as f:
+        header = f.read(12)
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, mime_type in _MAGIC:
+        if header.startswith(signature):
+            return mime_type
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def _hash_image(image_path: str, mtime: int) -> str:
+    """SHA-256 of the original image file, cached by path and modification time."""
+    return hashlib.sha256(Path(image_path).read_bytes()).hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _encode_image(image_path: str, mtime: int, autocrop: bool = False) -> Tuple[bytes, str]:
+    """Prepared image as (JPEG bytes, MIME type), cached by path and modification time."""
+    return _prepare_image(image_path, autocrop)
+
 
 class ErgScreenReader:
     """
@@ -31,63 +259,235 @@ class ErgScreenReader:
     statistics and detailed split/interval breakdowns.
     """
     
-    def __init__(self):
-        """Initialize the ErgScreenReader with necessary clients."""
-        self.openai_client = AsyncOpenAI()
+    def __init__(self, cache: Optional[ResultCache] = None, upload_images: bool = True,
+                 max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS):
+        """
+        Initialize the ErgScreenReader with necessary clients.
+        
+        Args:
+            cache: Store for extraction results and uploaded file ids
+            upload_images: Send images through the OpenAI Files API and reference them
+                by file id; set False to inline them as base64 data URLs instead
+            max_concurrent_requests: Most model requests in flight at once; further
+                extractions wait for a free slot
+        """
+        # One client per reader: its connection pool belongs to the event loop that first uses it,
+        # and is shared by all of this reader's (possibly batched) calls
+        self.openai_client = _make_client()
+        self.cache = cache or ResultCache()
+        self.upload_images = upload_images
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
+        # Image inputs being prepared, so concurrent calls on one image share the work
+        self._pending_inputs: Dict[str, "asyncio.Task[dict]"] = {}
+    
+    async def aclose(self) -> None:
+        """Close this reader's OpenAI client and its connection pool."""
+        await self.openai_client.close()
     
-    async def extract_workout_data_ai(self, image_path: str, model: str = "gpt-4o") -> ReceiptDetails:
+    def _stat_image(self, image_path: str) -> int:
         """
-        Extract workout data from an ergometer image using OpenAI's AI vision.
+        Validate an image path and return its modification time.
+        
+        Raises:
+            FileNotFoundError: If the image file doesn't exist
+            ValueError: If the image format is not supported
+        """
+        # Validate image file exists (one stat serves as both check and mtime)
+        try:
+            mtime = os.stat(image_path).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Image file not found: {image_path}") from None
+        
+        # Reject non-image files before decoding; files without a known extension
+        # are accepted if their magic bytes identify a supported format
+        if Path(image_path).suffix.lower() not in _IMAGE_SUFFIXES and _sniff_mime(image_path, mtime) is None:
+            raise ValueError(f"Could not determine MIME type for: {image_path}")
+        
+        return mtime
+    
+    async def _upload_image(self, image_bytes: bytes, mime_type: str) -> str:
+        """Upload prepared image bytes to the OpenAI Files API and return the file id."""
+        extension = mime_type.split("/")[-1]
+        uploaded = await self.openai_client.files.create(
+            file=(f"erg_screen.{extension}", image_bytes, mime_type),
+            purpose="vision",
+            expires_after={"anchor": "created_at", "seconds": UPLOAD_TTL_SECONDS},
+        )
+        return uploaded.id
+    
+    async def _image_input(self, image_path: str, mtime: int, image_sha256: str,
+                           autocrop: bool, reupload: bool = False) -> dict:
+        """
+        Build the input_image content part for an image.
+        
+        Uploaded file ids are cached by image hash, so analysing the same image
+        again (e.g. with a different prompt) doesn't resend it. Concurrent calls
+        for the same image await a single preparation/upload.
+        """
+        upload_key = ResultCache.make_upload_key(image_sha256, preprocessing="autocrop" if autocrop else "")
+        if reupload:
+            return await self._build_image_input(image_path, mtime, upload_key, autocrop, reupload)
+        
+        task = self._pending_inputs.get(upload_key)
+        if task is None:
+            task = asyncio.ensure_future(self._build_image_input(image_path, mtime, upload_key, autocrop))
+            self._pending_inputs[upload_key] = task
+            task.add_done_callback(lambda _: self._pending_inputs.pop(upload_key, None))
+        return await asyncio.shield(task)
+    
+    async def _build_image_input(self, image_path: str, mtime: int, upload_key: str,
+                                 autocrop: bool, reupload: bool = False) -> dict:
+        """Prepare an image and return it as a file-id or data-URL content part."""
+        if self.upload_images and not reupload:
+            file_id = self.cache.get(upload_key)
+            if file_id:
+                return {"type": "input_image", "file_id": file_id}
+        
+        # Resizing runs in a worker thread so concurrent extractions keep uploading
+        image_bytes, mime_type = await asyncio.to_thread(_encode_image, image_path, mtime, autocrop)
+        
+        if self.upload_images:
+            file_id = await self._upload_image(image_bytes, mime_type)
+            self.cache.set(upload_key, file_id)
+            return {"type": "input_image", "file_id": file_id}
+        
+        b64_image = await asyncio.to_thread(_b64encode, image_bytes)
+        return {"type": "input_image", "image_url": f"data:{mime_type};base64,{b64_image}"}
+    
+    async def _call_vision(self, image_path: str, prompt: str, schema: Type[SchemaT],
+                           model: str, use_cache: bool = True, autocrop: bool = False,
+                           image_sha256: Optional[str] = None) -> SchemaT:
+        """
+        Send an image and prompt to OpenAI's vision model and parse the reply.
         
         Args:
             image_path: Path to the ergometer screen image
+            prompt: Extraction prompt to send with the image
+            schema: Pydantic model the response is parsed into
             model: OpenAI model to use for image analysis
+            use_cache: Reuse a previous result for the same image, model and prompt
+            autocrop: Crop photos to the detected monitor screen before upload
+            image_sha256: SHA-256 of the image file if already known (skips re-reading it)
             
         Returns:
-            Structured workout data including summary and splits
+            The parsed response
             
         Raises:
-            FileNotFoundError: If the image file doesn't exist
-            ValueError: If the image format is not supported
+            ValueError: If the model returned no parsable output (e.g. a refusal)
         """
-        # Validate image file exists
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image file not found: {image_path}")
-        
-        # Determine image MIME type for data URI
-        mime_type, _ = mimetypes.guess_type(image_path)
-        if not mime_type:
-            raise ValueError(f"Could not determine MIME type for: {image_path}")
+        mtime = self._stat_image(image_path)
+        
+        # Return cached result if this image was already processed
+        if image_sha256 is None:
+            image_sha256 = await asyncio.to_thread(_hash_image, image_path, mtime)
+        cache_key = ResultCache.make_key(
+            image_sha256, model, PROMPT_VERSION, schema.__name__,
+            preprocessing="autocrop" if autocrop else ""
+        )
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return schema.model_validate_json(cached)
         
-        # Read and encode image as base64
-        image_bytes = Path(image_path).read_bytes()
-        b64_image = base64.b64encode(image_bytes).decode("utf-8")
-        image_data_url = f"data:{mime_type};base64,{b64_image}"
+        image_input = await self._image_input(image_path, mtime, image_sha256, autocrop)
         
         # Process image with OpenAI
-        response = await self.openai_client.responses.parse(
-            model=model,
-            input=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "input_text", "text": BASIC_PROMPT},
-                        {"type": "input_image", "image_url": image_data_url},
-                    ],
-                }
-            ],
-            text_format=ReceiptDetails,
+        try:
+            response = await self._parse(prompt, image_input, schema, model)
+        except (NotFoundError, BadRequestError) as e:
+            # A cached file id may refer to an upload that has since expired or been deleted
+            if "file_id" not in image_input or not _is_missing_file_error(e):
+                raise
+            image_input = await self._image_input(image_path, mtime, image_sha256, autocrop, reupload=True)
+            response = await self._parse(prompt, image_input, schema, model)
+        
+        result = response.output_parsed
+        if result is None:
+            raise ValueError(f"No structured output returned for: {image_path}")
+        if use_cache:
+            self.cache.set(cache_key, result.model_dump_json())
+        
+        return result
+    
+    async def _parse(self, prompt: str, image_input: dict, schema: Type[SchemaT], model: str) -> ParsedResponse[SchemaT]:
+        """Call responses.parse with a prompt and one image."""
+        # The static prompt goes first as instructions so repeated calls share a cacheable prefix
+        async with self._request_slots:
+            return await self.openai_client.responses.parse(
+                model=model,
+                instructions=prompt,
+                input=[
+                    {
+                        "role": "user",
+                        "content": [image_input],
+                    }
+                ],
+                text_format=schema,
+            )
+    
+    async def extract_all(self, image_path: str, model: str = "gpt-4o", use_cache: bool = True,
+                          autocrop: bool = False, image_sha256: Optional[str] = None
+                          ) -> Tuple[ReceiptDetails, IntervalReceiptDetails]:
+        """
+        Extract both the regular and the interval breakdown from one image.
+        
+        The image is prepared (and uploaded) once and both prompts run concurrently.
+        
+        Args:
+            image_path: Path to the ergometer screen image
+            model: OpenAI model to use for image analysis
+            use_cache: Reuse previous results for the same image, model and prompt
+            autocrop: Crop photos to the detected monitor screen before upload
+            image_sha256: SHA-256 of the image file if already known (skips re-reading it)
+            
+        Returns:
+            Tuple of (regular workout data, interval workout data)
+            
+        Raises:
+            FileNotFoundError: If the image file doesn't exist
+            ValueError: If the image format is not supported
+        """
+        regular, interval = await asyncio.gather(
+            self._call_vision(image_path, BASIC_PROMPT, ReceiptDetails, model, use_cache, autocrop, image_sha256),
+            self._call_vision(image_path, INTERVAL_PROMPT, IntervalReceiptDetails, model, use_cache, autocrop,
+                              image_sha256),
         )
+        return regular, interval
+    
+    async def extract_workout_data_ai(self, image_path: str, model: str = "gpt-4o", use_cache: bool = True,
+                                      autocrop: bool = False, image_sha256: Optional[str] = None) -> ReceiptDetails:
+        """
+        Extract workout data from an ergometer image using OpenAI's AI vision.
         
-        return response.output_parsed
+        Args:
+            image_path: Path to the ergometer screen image
+            model: OpenAI model to use for image analysis
+            use_cache: Reuse a previous result for the same image, model and prompt
+            autocrop: Crop photos to the detected monitor screen before upload
+            image_sha256: SHA-256 of the image file if already known (skips re-reading it)
+            
+        Returns:
+            Structured workout data including summary and splits
+            
+        Raises:
+            FileNotFoundError: If the image file doesn't exist
+            ValueError: If the image format is not supported
+        """
+        return await self._call_vision(image_path, BASIC_PROMPT, ReceiptDetails, model, use_cache, autocrop,
+                                       image_sha256)
     
-    async def extract_interval_workout_data_ai(self, image_path: str, model: str = "gpt-4o") -> IntervalReceiptDetails:
+    async def extract_interval_workout_data_ai(self, image_path: str, model: str = "gpt-4o", use_cache: bool = True,
+                                               autocrop: bool = False,
+                                               image_sha256: Optional[str] = None) -> IntervalReceiptDetails:
         """
         Extract interval workout data from an ergometer image using OpenAI's AI vision.
         
         Args:
             image_path: Path to the ergometer screen image
             model: OpenAI model to use for image analysis
+            use_cache: Reuse a previous result for the same image, model and prompt
+            autocrop: Crop photos to the detected monitor screen before upload
+            image_sha256: SHA-256 of the image file if already known (skips re-reading it)
             
         Returns:
             Structured interval workout data including summary and intervals
@@ -96,134 +496,82 @@ class ErgScreenReader:
             FileNotFoundError: If the image file doesn't exist
             ValueError: If the image format is not supported
         """
-        # Validate image file exists
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image file not found: {image_path}")
-        
-        # Determine image MIME type for data URI
-        mime_type, _ = mimetypes.guess_type(image_path)
-        if not mime_type:
-            raise ValueError(f"Could not determine MIME type for: {image_path}")
-        
-        # Read and encode image as base64
-        image_bytes = Path(image_path).read_bytes()
-        b64_image = base64.b64encode(image_bytes).decode("utf-8")
-        image_data_url = f"data:{mime_type};base64,{b64_image}"
-        
-        # Process image with OpenAI
-        response = await self.openai_client.responses.parse(
-            model=model,
-            input=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "input_text", "text": INTERVAL_PROMPT},
-                        {"type": "input_image", "image_url": image_data_url},
-                    ],
-                }
-            ],
-            text_format=IntervalReceiptDetails,
-        )
-        
-        return response.output_parsed
+        return await self._call_vision(image_path, INTERVAL_PROMPT, IntervalReceiptDetails, model, use_cache,
+                                       autocrop, image_sha256)
     
-    def create_excel_report(self, summary: Dict, splits: List, output_filename: str = "output.xlsx", name: str = "John C150") -> None:
+    def create_excel_report(self, summary: Dict, splits: List, output_filename: str = "output.xlsx", name: str = "John C150",
+                            writer: str = "openpyxl") -> None:
         """
         Create a well-formatted Excel report with workout data.
         
         Args:
             summary: Summary workout data
-            splits: List of split data dictionaries
+            splits: List of splits (Pydantic models or dictionaries)
             output_filename: Name of the output Excel file
             name: Name of the rower
+            writer: Excel writer to use, 'openpyxl' or 'xlsxwriter' (constant memory)
         """
-        # Convert Pydantic models to dictionaries if needed
-        summary_dict = self._convert_to_dict(summary)
-        splits_dict = [self._convert_to_dict(split) for split in splits] if splits else []
+        if writer not in EXCEL_WRITERS:
+            raise ValueError(f"Unsupported Excel writer: {writer}")
         
-        # Check if file exists and load existing data
-        existing_summary_data = None
-        existing_sheets_data = {}
-        if os.path.exists(output_filename):
-            try:
-                # Read all existing data before we start writing
-                excel_file = pd.ExcelFile(output_filename)
-                existing_summary_data = pd.read_excel(output_filename, sheet_name='Summary')
-                print(f"Found existing summary data with {len(existing_summary_data)} rows")
-                
-                # Store all existing sheets data
-                for sheet_name in excel_file.sheet_names:
-                    if sheet_name != 'Summary':
-                        existing_sheets_data[sheet_name] = pd.read_excel(output_filename, sheet_name=sheet_name)
-                        print(f"Found existing sheet: {sheet_name}")
-            except Exception as e:
-                print(f"Could not read existing data: {e}")
+        # Rows are read field by field, so only the summary needs converting
+        summary_dict = self._convert_to_dict(summary)
+        splits_dict = list(splits) if splits else []
         
-        # Create Excel file with multiple sheets
-        with pd.ExcelWriter(output_filename, engine='openpyxl', mode='w') as writer:
-            unique_name = self._write_summary_sheet(writer, summary_dict, name, existing_summary_data)
-            self._write_splits_sheet(writer, splits_dict, unique_name)
+        if writer == "xlsxwriter":
+            unique_name = self._stream_excel_report(
+                output_filename, summary_dict, name, self._summary_row, "workout",
+                "Split Breakdown", SPLIT_KEYS, splits_dict
+            )
+        else:
+            # Open the existing workbook so only the new row and sheet are written
+            wb = self._load_workbook(output_filename)
             
-            # Write back all existing sheets (except the ones we just wrote)
-            for sheet_name, sheet_data in existing_sheets_data.items():
-                if sheet_name != f"{unique_name} Split Breakdown":
-                    sheet_data.to_excel(writer, sheet_name=sheet_name, index=False)
-                    print(f"Preserved existing sheet: {sheet_name}")
-        
-        # Print success message
-        print(f"Excel report created: {output_filename}")
-        print(f"  - Summary sheet: {len(summary_dict) if summary_dict else 0} metrics")
-        print(f"  - {unique_name} Split Breakdown sheet: {len(splits_dict)} splits")
-    
-    def create_interval_excel_report(self, summary: Dict, intervals: List, output_filename: str = "interval_output.xlsx", name: str = "John C150") -> None:
+            unique_name = self._write_summary_sheet(wb, summary_dict, name)
+            self._write_splits_sheet(wb, splits_dict, unique_name)
+            
+            wb.save(output_filename)
+        
+        logger.debug("Excel report created: %s (%d summary metrics, %s Split Breakdown: %d splits)",
+                     output_filename, len(summary_dict) if summary_dict else 0, unique_name, len(splits_dict))
+    
+    def create_interval_excel_report(self, summary: Dict, intervals: List, output_filename: str = "interval_output.xlsx", name: str = "John C150",
+                                     writer: str = "openpyxl") -> None:
         """
         Create a well-formatted Excel report with interval workout data.
         
         Args:
             summary: Summary interval workout data
-            intervals: List of interval data dictionaries
+            intervals: List of intervals (Pydantic models or dictionaries)
             output_filename: Name of the output Excel file
             name: Name of the rower
+            writer: Excel writer to use, 'openpyxl' or 'xlsxwriter' (constant memory)
         """
-        # Convert Pydantic models to dictionaries if needed
-        summary_dict = self._convert_to_dict(summary)
-        intervals_dict = [self._convert_to_dict(interval) for interval in intervals] if intervals else []
+        if writer not in EXCEL_WRITERS:
+            raise ValueError(f"Unsupported Excel writer: {writer}")
         
-        # Check if file exists and load existing data
-        existing_summary_data = None
-        existing_sheets_data = {}
-        if os.path.exists(output_filename):
-            try:
-                # Read all existing data before we start writing
-                excel_file = pd.ExcelFile(output_filename)
-                existing_summary_data = pd.read_excel(output_filename, sheet_name='Summary')
-                print(f"Found existing summary data with {len(existing_summary_data)} rows")
-                
-                # Store all existing sheets data
-                for sheet_name in excel_file.sheet_names:
-                    if sheet_name != 'Summary':
-                        existing_sheets_data[sheet_name] = pd.read_excel(output_filename, sheet_name=sheet_name)
-                        print(f"Found existing sheet: {sheet_name}")
-            except Exception as e:
-                print(f"Could not read existing data: {e}")
+        # Rows are read field by field, so only the summary needs converting
+        summary_dict = self._convert_to_dict(summary)
+        intervals_dict = list(intervals) if intervals else []
         
-        # Create Excel file with multiple sheets
-        with pd.ExcelWriter(output_filename, engine='openpyxl', mode='w') as writer:
-            unique_name = self._write_interval_summary_sheet(writer, summary_dict, name, existing_summary_data)
-            self._write_intervals_sheet(writer, intervals_dict, unique_name)
+        if writer == "xlsxwriter":
+            unique_name = self._stream_excel_report(
+                output_filename, summary_dict, name, self._interval_summary_row, "interval workout",
+                "Interval Breakdown", INTERVAL_KEYS, intervals_dict
+            )
+        else:
+            # Open the existing workbook so only the new row and sheet are written
+            wb = self._load_workbook(output_filename)
+            
+            unique_name = self._write_interval_summary_sheet(wb, summary_dict, name)
+            self._write_intervals_sheet(wb, intervals_dict, unique_name)
             
-            # Write back all existing sheets (except the ones we just wrote)
-            for sheet_name, sheet_data in existing_sheets_data.items():
-                if sheet_name != f"{unique_name} Interval Breakdown":
-                    sheet_data.to_excel(writer, sheet_name=sheet_name, index=False)
-                    print(f"Preserved existing sheet: {sheet_name}")
-        
-        # Print success message
-        print(f"Interval Excel report created: {output_filename}")
-        print(f"  - Summary sheet: {len(summary_dict) if summary_dict else 0} metrics")
-        print(f"  - {unique_name} Interval Breakdown sheet: {len(intervals_dict)} intervals")
-    
-    def _convert_to_dict(self, obj) -> dict:
+            wb.save(output_filename)
+        
+        logger.debug("Interval Excel report created: %s (%d summary metrics, %s Interval Breakdown: %d intervals)",
+                     output_filename, len(summary_dict) if summary_dict else 0, unique_name, len(intervals_dict))
+    
+    def _convert_to_dict(self, obj: Any) -> dict:
         """Convert Pydantic model or dict to plain dictionary."""
         if hasattr(obj, 'model_dump'):
             return obj.model_dump()
@@ -234,160 +582,268 @@ class ErgScreenReader:
         else:
             return {}
     
-    def _get_unique_name(self, name: str, existing_data: Optional[pd.DataFrame] = None) -> str:
+    def _load_workbook(self, output_filename: str) -> Workbook:
+        """Open an existing report workbook for appending, or start an empty one."""
+        if os.path.exists(output_filename):
+            try:
+                wb = openpyxl.load_workbook(output_filename)
+                logger.debug("Found existing workbook with sheets: %s", wb.sheetnames)
+                return wb
+            except Exception as e:
+                logger.warning("Could not read existing data: %s", e)
+        
+        wb = Workbook()
+        wb.remove(wb.active)
+        return wb
+    
+    def _get_existing_names(self, wb: Workbook) -> List[str]:
+        """Get the rower names already recorded in the Summary sheet."""
+        if 'Summary' not in wb.sheetnames:
+            return []
+        
+        ws = wb['Summary']
+        headers = list(next(ws.iter_rows(max_row=1, values_only=True), ()))
+        if 'Name' not in headers:
+            return []
+        
+        name_col = headers.index('Name') + 1
+        return [
+            str(value)
+            for (value,) in ws.iter_rows(min_row=2, min_col=name_col, max_col=name_col, values_only=True)
+            if value is not None
+        ]
+    
+    def _get_unique_name(self, name: str, existing_names: Optional[List[str]] = None) -> str:
         """Generate a unique name by adding a number suffix if the name already exists."""
-        if existing_data is None or existing_data.empty:
+        if not existing_names:
             return name
         
-        # Get existing names
-        existing_names = existing_data['Name'].tolist() if 'Name' in existing_data.columns else []
-        
         # If name doesn't exist, return as is
-        if name not in existing_names:
+        names = set(existing_names)
+        if name not in names:
             return name
         
-        # Find the highest number suffix for this base name
-        base_name = name
-        max_suffix = 1
-        
-        for existing_name in existing_names:
-            if existing_name == base_name:
-                continue
-            if existing_name.startswith(f"{base_name} "):
-                suffix_part = existing_name[len(base_name) + 1:]
-                try:
-                    suffix_num = int(suffix_part)
-                    max_suffix = max(max_suffix, suffix_num)
-                except ValueError:
-                    continue
+        # Find the highest number suffix for this base name ("<name> <digits>")
+        prefix = f"{name} "
+        start = len(prefix)
+        max_suffix = max(
+            (int(n[start:]) for n in names if n.startswith(prefix) and n[start:].isdecimal()),
+            default=1
+        )
         
         # Return the next available number
-        return f"{base_name} {max_suffix + 1}"
+        return f"{name} {max(max_suffix, 1) + 1}"
+    
+    def _append_summary_row(self, wb: Workbook, row: dict) -> bool:
+        """
+        Append a row to the Summary sheet, adding any columns it doesn't have yet.
+        
+        Returns:
+            True if the row was appended to an existing Summary sheet
+        """
+        existed = 'Summary' in wb.sheetnames
+        if existed:
+            ws = wb['Summary']
+            headers = [cell.value for cell in ws[1]]
+            if headers == [None]:
+                headers = []
+        else:
+            ws = wb.create_sheet('Summary', 0)
+            headers = []
+        
+        # Ensure columns match; earlier rows get 'N/A' for new columns
+        for col in row:
+            if col not in headers:
+                headers.append(col)
+                col_idx = len(headers)
+                ws.cell(row=1, column=col_idx, value=col).font = HEADER_FONT
+                for row_idx in range(2, ws.max_row + 1):
+                    ws.cell(row=row_idx, column=col_idx, value='N/A')
+        
+        ws.append([row.get(col) for col in headers])
+        return existed
+    
+    def _write_breakdown_sheet(self, wb: Workbook, sheet_name: str, columns: Tuple[Tuple[str, str], ...],
+                               rows: List[dict]) -> None:
+        """Write a split/interval breakdown sheet, replacing any sheet with the same name."""
+        if sheet_name in wb.sheetnames:
+            del wb[sheet_name]
+        
+        ws = wb.create_sheet(sheet_name)
+        ws.append([header for header, _ in columns])
+        for cell in ws[1]:
+            cell.font = HEADER_FONT
+        
+        for row in rows:
+            ws.append([_get_field(row, key) for _, key in columns])
     
-    def _write_summary_sheet(self, writer: pd.ExcelWriter, summary_dict: dict, name: str, existing_data: Optional[pd.DataFrame] = None) -> str:
+    def _write_summary_sheet(self, wb: Workbook, summary_dict: dict, name: str) -> str:
         """Write summary data to Excel sheet."""
         if not summary_dict:
             return name
         
         # Get unique name to avoid conflicts
-        unique_name = self._get_unique_name(name, existing_data)
-        
-        # Create horizontal summary with unique name as first column
-        new_summary_data = {
-            'Name': [unique_name],
-            'Total Distance (m)': [summary_dict.get('total_distance', '')],
-            'Total Time': [summary_dict.get('total_time', '')],
-            'Average Split': [summary_dict.get('average_split', '')],
-            'Average Rate (spm)': [summary_dict.get('average_rate', '')],
-            'Average HR': [summary_dict.get('average_hr', '') if summary_dict.get('average_hr') is not None else ''],
-            'Average Watts': [summary_dict.get('average_watts', '') if summary_dict.get('average_watts') is not None else '']
-        }
-        
-        new_summary_df = pd.DataFrame(new_summary_data)
+        unique_name = self._get_unique_name(name, self._get_existing_names(wb))
+        new_summary_data = self._summary_row(summary_dict, unique_name)
         
-        # If existing data exists, append the new row
-        if existing_data is not None:
-            # Ensure columns match
-            for col in new_summary_df.columns:
-                if col not in existing_data.columns:
-                    existing_data[col] = 'N/A'
-            
-            # Append new data to existing data
-            combined_df = pd.concat([existing_data, new_summary_df], ignore_index=True)
-            print(f"Appended new workout data for {unique_name} to existing summary")
+        if self._append_summary_row(wb, new_summary_data):
+            logger.debug("Appended new workout data for %s to existing summary", unique_name)
         else:
-            combined_df = new_summary_df
-            print(f"Created new summary sheet with workout data for {unique_name}")
+            logger.debug("Created new summary sheet with workout data for %s", unique_name)
         
-        combined_df.to_excel(writer, sheet_name='Summary', index=False)
         return unique_name
     
-    def _write_splits_sheet(self, writer: pd.ExcelWriter, splits_dict: list, name: str) -> None:
+    def _summary_row(self, summary_dict: dict, unique_name: str) -> dict:
+        """Build the horizontal Summary row for a regular workout, name first."""
+        return {
+            'Name': unique_name,
+            'Total Distance (m)': summary_dict.get('total_distance', ''),
+            'Total Time': summary_dict.get('total_time', ''),
+            'Average Split': summary_dict.get('average_split', ''),
+            'Average Rate (spm)': summary_dict.get('average_rate', ''),
+            'Average HR': summary_dict.get('average_hr', '') if summary_dict.get('average_hr') is not None else '',
+            'Average Watts': summary_dict.get('average_watts', '') if summary_dict.get('average_watts') is not None else ''
+        }
+    
+    def _interval_summary_row(self, summary_dict: dict, unique_name: str) -> dict:
+        """Build the horizontal Summary row for an interval workout, name first."""
+        row = self._summary_row(summary_dict, unique_name)
+        row['Total Intervals'] = summary_dict.get('total_intervals', '')
+        row['Rest Time'] = summary_dict.get('rest_time', '') if summary_dict.get('rest_time') else ''
+        return row
+    
+    def _write_splits_sheet(self, wb: Workbook, splits_dict: list, name: str) -> None:
         """Write splits data to Excel sheet."""
         if not splits_dict:
             return
         
-        splits_data = []
-        for split in splits_dict:
-            splits_data.append({
-                'Split #': split.get('split_number', ''),
-                'Distance (m)': split.get('split_distance', ''),
-                'Time': split.get('split_time', ''),
-                'Pace': split.get('split_pace', ''),
-                'Rate (spm)': split.get('rate', ''),
-                'HR': split.get('hr', '') if split.get('hr') is not None else '',
-                'Watts': split.get('watts', '') if split.get('watts') is not None else ''
-            })
-        
-        splits_df = pd.DataFrame(splits_data)
-        sheet_name = f"{name} Split Breakdown"
-        splits_df.to_excel(writer, sheet_name=sheet_name, index=False)
-    
-    def _write_interval_summary_sheet(self, writer: pd.ExcelWriter, summary_dict: dict, name: str, existing_data: Optional[pd.DataFrame] = None) -> str:
+        self._write_breakdown_sheet(wb, f"{name} Split Breakdown", SPLIT_KEYS, splits_dict)
+    
+    def _write_interval_summary_sheet(self, wb: Workbook, summary_dict: dict, name: str) -> str:
         """Write interval summary data to Excel sheet."""
         if not summary_dict:
             return name
         
         # Get unique name to avoid conflicts
-        unique_name = self._get_unique_name(name, existing_data)
-        
-        # Create horizontal summary with unique name as first column
-        new_summary_data = {
-            'Name': [unique_name],
-            'Total Distance (m)': [summary_dict.get('total_distance', '')],
-            'Total Time': [summary_dict.get('total_time', '')],
-            'Average Split': [summary_dict.get('average_split', '')],
-            'Average Rate (spm)': [summary_dict.get('average_rate', '')],
-            'Average HR': [summary_dict.get('average_hr', '') if summary_dict.get('average_hr') is not None else ''],
-            'Average Watts': [summary_dict.get('average_watts', '') if summary_dict.get('average_watts') is not None else ''],
-            'Total Intervals': [summary_dict.get('total_intervals', '')],
-            'Rest Time': [summary_dict.get('rest_time', '') if summary_dict.get('rest_time') else '']
-        }
+        unique_name = self._get_unique_name(name, self._get_existing_names(wb))
+        new_summary_data = self._interval_summary_row(summary_dict, unique_name)
         
-        new_summary_df = pd.DataFrame(new_summary_data)
-        
-        # If existing data exists, append the new row
-        if existing_data is not None:
-            # Ensure columns match
-            for col in new_summary_df.columns:
-                if col not in existing_data.columns:
-                    existing_data[col] = 'N/A'
-            
-            # Append new data to existing data
-            combined_df = pd.concat([existing_data, new_summary_df], ignore_index=True)
-            print(f"Appended new interval workout data for {unique_name} to existing summary")
+        if self._append_summary_row(wb, new_summary_data):
+            logger.debug("Appended new interval workout data for %s to existing summary", unique_name)
         else:
-            combined_df = new_summary_df
-            print(f"Created new summary sheet with interval workout data for {unique_name}")
+            logger.debug("Created new summary sheet with interval workout data for %s", unique_name)
         
-        combined_df.to_excel(writer, sheet_name='Summary', index=False)
         return unique_name
     
-    def _write_intervals_sheet(self, writer: pd.ExcelWriter, intervals_dict: list, name: str) -> None:
+    def _write_intervals_sheet(self, wb: Workbook, intervals_dict: list, name: str) -> None:
         """Write intervals data to Excel sheet."""
         if not intervals_dict:
             return
         
-        intervals_data = []
-        for interval in intervals_dict:
-            intervals_data.append({
-                'Interval #': interval.get('interval_number', ''),
-                'Distance (m)': interval.get('interval_distance', ''),
-                'Time': interval.get('interval_time', ''),
-                'Pace': interval.get('interval_pace', ''),
-                'Rate (spm)': interval.get('rate', ''),
-                'HR': interval.get('hr', '') if interval.get('hr') is not None else '',
-                'Watts': interval.get('watts', '') if interval.get('watts') is not None else '',
-                'Rest Time': interval.get('rest_time', '') if interval.get('rest_time') else ''
-            })
+        self._write_breakdown_sheet(wb, f"{name} Interval Breakdown", INTERVAL_KEYS, intervals_dict)
+
+    
+    def _stream_excel_report(self, output_filename: str, summary_dict: dict, name: str,
+                             build_row: Callable[[dict, str], dict], label: str, sheet_suffix: str,
+                             columns: Tuple[Tuple[str, str], ...], rows: list) -> str:
+        """
+        Rewrite the report with xlsxwriter in constant_memory mode.
+        
+        Existing sheets are streamed row by row from a read-only workbook, the
+        Summary sheet gains the new row and the breakdown sheet is written last,
+        so the workbook is never held in memory in full.
+        
+        Returns:
+            The unique name the workout was recorded under
+        """
+        try:
+            import xlsxwriter
+        except ImportError as e:
+            raise ValueError(
+                "The xlsxwriter writer requires the xlsxwriter package. "
+                "Install it with: pip install 'erg-screen-reader[xlsxwriter]'"
+            ) from e
+        
+        src = None
+        if os.path.exists(output_filename):
+            try:
+                src = openpyxl.load_workbook(output_filename, read_only=True)
+                logger.debug("Found existing workbook with sheets: %s", src.sheetnames)
+            except Exception as e:
+                logger.warning("Could not read existing data: %s", e)
+        
+        # xlsxwriter only writes whole files, so build next to the original and swap in
+        tmp_filename = f"{output_filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            existing_sheets = src.sheetnames if src else []
+            unique_name = name
+            summary_row = None
+            if summary_dict:
+                unique_name = self._get_unique_name(name, self._get_existing_names(src) if src else [])
+                summary_row = build_row(summary_dict, unique_name)
+            sheet_name = f"{unique_name} {sheet_suffix}"
+            
+            out = xlsxwriter.Workbook(tmp_filename, {'constant_memory': True})
+            header_format = out.add_format({'bold': True})
+            
+            # Summary first; earlier rows get 'N/A' for columns the new row adds
+            if summary_row or 'Summary' in existing_sheets:
+                source_rows = (src['Summary'].iter_rows(values_only=True)
+                               if src is not None and 'Summary' in existing_sheets else iter(()))
+                headers = list(next(source_rows, ()))
+                while headers and headers[-1] is None:
+                    headers.pop()
+                added = [col for col in summary_row if col not in headers] if summary_row else []
+                
+                ws = out.add_worksheet('Summary')
+                ws.write_row(0, 0, headers + added, header_format)
+                row_idx = 1
+                for values in source_rows:
+                    values = list(values[:len(headers)])
+                    values += [None] * (len(headers) - len(values))
+                    ws.write_row(row_idx, 0, values + ['N/A'] * len(added))
+                    row_idx += 1
+                if summary_row:
+                    ws.write_row(row_idx, 0, [summary_row.get(col) for col in headers + added])
+            
+            # Copy the other sheets through, dropping one the new breakdown replaces
+            if src is not None:
+                for existing in existing_sheets:
+                    if existing == 'Summary' or (rows and existing == sheet_name):
+                        continue
+                    ws = out.add_worksheet(existing)
+                    for row_idx, values in enumerate(src[existing].iter_rows(values_only=True)):
+                        ws.write_row(row_idx, 0, values, header_format if row_idx == 0 else None)
+            
+            if rows:
+                ws = out.add_worksheet(sheet_name)
+                ws.write_row(0, 0, [header for header, _ in columns], header_format)
+                for row_idx, row in enumerate(rows, start=1):
+                    ws.write_row(row_idx, 0, [_get_field(row, key) for _, key in columns])
+            
+            out.close()
+        except BaseException:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            raise
+        finally:
+            if src:
+                src.close()
+        
+        os.replace(tmp_filename, output_filename)
+        
+        if summary_row:
+            if 'Summary' in existing_sheets:
+                logger.debug("Appended new %s data for %s to existing summary", label, unique_name)
+            else:
+                logger.debug("Created new summary sheet with %s data for %s", label, unique_name)
         
-        intervals_df = pd.DataFrame(intervals_data)
-        sheet_name = f"{name} Interval Breakdown"
-        intervals_df.to_excel(writer, sheet_name=sheet_name, index=False)
+        return unique_name
 
 
+@functools.lru_cache(maxsize=1)
 def validate_environment() -> None:
-    """Validate that required environment variables are set."""
+    """Validate that required environment variables are set (cached once it passes)."""
     if not os.getenv('OPENAI_API_KEY'):
         raise ValueError(
             "OPENAI_API_KEY environment variable is required for AI processing. "
@@ -4,24 +4,66 @@ Google Sheets integration for ErgScreenReader.
 Provides functionality to create and populate Google Sheets with workout data.
 """
 
+import asyncio
+import functools
+import logging
+import operator
 import os
-from datetime import datetime
-from typing import List, Optional
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union, cast
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google.oauth2.service_account import Credentials as ServiceAccountCredentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+# The google-auth/discovery clients are imported where used so importing this
+# module stays cheap; only the (light) error type is needed up front
 from googleapiclient.errors import HttpError
 import json
 
 from erg_screen_reader.models import Summary, Split, IntervalSummary, Interval
 
+logger = logging.getLogger(__name__)
+
+# Socket timeout (seconds) for Google API requests
+HTTP_TIMEOUT = 60
+
+# Breakdown row getters, in sheet column order
+_SPLIT_FIELDS = operator.attrgetter(
+    'split_number', 'split_distance', 'split_time', 'split_pace', 'rate', 'hr', 'watts'
+)
+_INTERVAL_FIELDS = operator.attrgetter(
+    'interval_number', 'interval_distance', 'interval_time', 'interval_pace', 'rate', 'hr', 'watts', 'rest_time'
+)
+
+# Header rows, matching the field getters above
+_SUMMARY_HEADERS = (
+    'Rower', 'Total Distance (m)', 'Total Time', 'Average Split', 'Average Rate (SPM)', 'Average HR', 'Average Watts'
+)
+_INTERVAL_SUMMARY_HEADERS = _SUMMARY_HEADERS + ('Total Intervals', 'Rest Time')
+_SPLIT_HEADERS = ('Split', 'Distance (m)', 'Time', 'Pace', 'Rate (SPM)', 'HR', 'Watts')
+_INTERVAL_HEADERS = ('Interval', 'Distance (m)', 'Time', 'Pace', 'Rate (SPM)', 'HR', 'Watts', 'Rest Time')
+
+# API versions of the Google services used
+API_VERSIONS = {'sheets': 'v4', 'drive': 'v3'}
+
+# Worker threads for AsyncGoogleSheetsService
+ASYNC_MAX_WORKERS = 8
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+# Longest Retry-After (seconds) honoured before giving up on the server's hint
+MAX_RETRY_AFTER = 60.0
+
+T = TypeVar('T')
+
+_thread_local = threading.local()
+_auth_lock = threading.Lock()
+
 
 class GoogleSheetsService:
     """Service for creating and managing Google Sheets with workout data."""
@@ -29,8 +71,14 @@ class GoogleSheetsService:
     # Google Sheets API scope
     SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
     
+    # Scope for service accounts that only need Sheets (Drive is only used for public sharing)
+    SHEETS_SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+    
     def __init__(self, credentials_path: Optional[str] = None, token_path: str = "token.json"):
         """Initialize Google Sheets service."""
+        # Load environment variables
+        _load_env()
+        
         # Use environment variable or provided path, fallback to default
         if credentials_path:
             self.credentials_path = credentials_path
@@ -38,58 +86,34 @@ class GoogleSheetsService:
             self.credentials_path = os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json')
         
         self.token_path = token_path
-        self.service = None
-        self.drive_service = None
+        self.service: Any = None
+        self.drive_service: Any = None
         
     def authenticate(self) -> None:
         """Authenticate with Google Sheets API."""
+        self.service = self._get_service('sheets')
+    
+    def _get_service(self, api: str) -> Any:
+        """Get the 'sheets' or 'drive' API client, authenticating on first use."""
         if not os.path.exists(self.credentials_path):
             raise FileNotFoundError(
                 f"Google credentials file not found: {self.credentials_path}\n"
                 "Please download it from Google Cloud Console and place it in the project root."
             )
         
-        # Check if this is a service account credentials file
         try:
-            with open(self.credentials_path, 'r') as f:
-                credentials_info = json.load(f)
-            
-            # If it's a service account, use service account credentials
-            if credentials_info.get('type') == 'service_account':
-                creds = ServiceAccountCredentials.from_service_account_file(
-                    self.credentials_path, scopes=self.SCOPES)
-            else:
-                # Handle OAuth2 credentials (web/installed app)
-                creds = None
-                
-                # Load existing token
-                if os.path.exists(self.token_path):
-                    creds = Credentials.from_authorized_user_file(self.token_path, self.SCOPES)
-                
-                # If no valid credentials, request authorization
-                if not creds or not creds.valid:
-                    if creds and creds.expired and creds.refresh_token:
-                        creds.refresh(Request())
-                    else:
-                        flow = InstalledAppFlow.from_client_secrets_file(
-                            self.credentials_path, self.SCOPES)
-                        creds = flow.run_local_server(port=0)
-                    
-                    # Save credentials for future use
-                    with open(self.token_path, 'w') as token:
-                        token.write(creds.to_json())
-            
-            # Build the services
-            self.service = build('sheets', 'v4', credentials=creds)
-            self.drive_service = build('drive', 'v3', credentials=creds)
+            # Credentials are shared across instances, services across instances on a thread
+            return _build_service(
+                api, os.path.abspath(self.credentials_path), os.path.abspath(self.token_path)
+            )
             
         except json.JSONDecodeError:
             raise ValueError(f"Invalid JSON in credentials file: {self.credentials_path}")
         except Exception as e:
             raise Exception(f"Error authenticating with Google Sheets: {str(e)}")
     
-    def create_spreadsheet(self, title: str) -> str:
-        """Create a new Google Spreadsheet."""
+    def create_spreadsheet(self, title: str, public: bool = False) -> str:
+        """Create a new Google Spreadsheet, optionally making it publicly editable."""
         if not self.service:
             self.authenticate()
         
@@ -100,11 +124,12 @@ class GoogleSheetsService:
                 }
             }
             
-            result = self.service.spreadsheets().create(body=spreadsheet).execute()
-            spreadsheet_id = result.get('spreadsheetId')
+            result = _execute_create(self.service.spreadsheets().create(body=spreadsheet))
+            spreadsheet_id: str = result.get('spreadsheetId')
             
             # Make the spreadsheet publicly accessible
-            self._make_public(spreadsheet_id)
+            if public:
+                self._make_public(spreadsheet_id)
             
             return spreadsheet_id
             
@@ -113,215 +138,564 @@ class GoogleSheetsService:
     
     def _make_public(self, spreadsheet_id: str) -> None:
         """Make a spreadsheet publicly accessible."""
+        # Deployments whose Drive already grants access (e.g. a shared folder) skip the Drive call
+        if os.getenv('ERG_SKIP_PUBLIC') == '1':
+            return
+        
+        # The Drive client is only needed for sharing, so it's built on first use
+        if not self.drive_service:
+            self.drive_service = self._get_service('drive')
+        
         try:
             permission = {
                 'type': 'anyone',
                 'role': 'writer'  # Allow anyone to edit
             }
             
-            self.drive_service.permissions().create(
+            _execute(self.drive_service.permissions().create(
                 fileId=spreadsheet_id,
                 body=permission,
                 sendNotificationEmail=False
-            ).execute()
+            ))
             
         except HttpError as error:
-            print(f"Warning: Could not make spreadsheet public: {error}")
+            logger.warning("Could not make spreadsheet public: %s", error)
     
-    def get_spreadsheet_url(self, spreadsheet_id: str) -> str:
+    @staticmethod
+    def get_spreadsheet_url(spreadsheet_id: str) -> str:
         """Get the URL for a Google Spreadsheet."""
         return f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit"
     
-    def generate_sheet_name(self, base_name: Optional[str] = None) -> str:
+    @staticmethod
+    def generate_sheet_name(base_name: Optional[str] = None) -> str:
         """Generate a sheet name with timestamp."""
-        if base_name:
-            return f"{base_name} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        else:
-            return f"Erg Screen Reader - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        return f"{base_name or 'Erg Screen Reader'} - {timestamp}"
     
-    def populate_regular_workout(self, spreadsheet_id: str, summary: Summary, 
-                                splits: List[Split], rower_name: str) -> None:
-        """Populate a Google Sheet with regular workout data."""
+    def create_and_populate(self, title: str, summary: Union[Summary, IntervalSummary],
+                            rows: Union[List[Split], List[Interval]], rower_name: str,
+                            make_public: bool = False) -> str:
+        """
+        Create a spreadsheet with the workout data already in it.
+        
+        The "Summary" and breakdown sheets and their values are sent inline in a
+        single spreadsheets.create call. Formatting follows as a separate
+        batchUpdate whose failure is only logged, so the data is never lost to
+        a bad format request. The Drive permission call is only made when
+        make_public is requested.
+        
+        Returns:
+            The new spreadsheet id
+        """
         if not self.service:
             self.authenticate()
         
-        try:
-            # Prepare summary data
-            summary_values = [
-                ['Rower', 'Total Distance (m)', 'Total Time', 'Average Split', 'Average Rate (SPM)', 'Average HR', 'Average Watts'],
-                [rower_name, summary.total_distance, summary.total_time, 
-                 summary.average_split, summary.average_rate, summary.average_hr or 'N/A', summary.average_watts or 'N/A']
+        if isinstance(summary, IntervalSummary):
+            summary_values, sheet_title, breakdown_values = self._interval_values(
+                summary, cast(List[Interval], rows), rower_name)
+        else:
+            summary_values, sheet_title, breakdown_values = self._regular_values(
+                summary, cast(List[Split], rows), rower_name)
+        
+        breakdown_sheet_id = zlib.crc32(sheet_title.encode()) & 0x7FFFFFFF or 1
+        spreadsheet = {
+            'properties': {
+                'title': title
+            },
+            'sheets': [
+                _sheet_with_data(0, 'Summary', summary_values),
+                _sheet_with_data(breakdown_sheet_id, sheet_title, breakdown_values)
             ]
-            
-            # Update summary sheet
-            self.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range='Sheet1!A1:G2',
-                valueInputOption='RAW',
-                body={'values': summary_values}
-            ).execute()
-            
-            # Create splits breakdown sheet
-            splits_sheet_title = f"{rower_name} Split Breakdown"
-            self._add_sheet(spreadsheet_id, splits_sheet_title)
-            
-            # Prepare splits data
-            splits_headers = ['Split', 'Distance (m)', 'Time', 'Pace', 'Rate (SPM)', 'HR', 'Watts']
-            splits_values = [splits_headers]
-            
-            for split in splits:
-                splits_values.append([
-                    split.split_number,
-                    split.split_distance,
-                    split.split_time,
-                    split.split_pace,
-                    split.rate,
-                    split.hr or 'N/A',
-                    split.watts or 'N/A'
-                ])
-            
-            # Update splits sheet
-            self.service.spreadsheets().values().update(
+        }
+        
+        try:
+            result = _execute_create(self.service.spreadsheets().create(
+                body=spreadsheet,
+                fields='spreadsheetId'
+            ))
+        except HttpError as error:
+            raise Exception(f"Error creating spreadsheet: {error}")
+        
+        spreadsheet_id: str = result.get('spreadsheetId')
+        
+        # Formatting is cosmetic; a rejected request leaves the data in place
+        requests = self._format_requests(0, summary_values) + \
+            self._format_requests(breakdown_sheet_id, breakdown_values)
+        try:
+            _execute(self.service.spreadsheets().batchUpdate(
                 spreadsheetId=spreadsheet_id,
-                range=f"'{splits_sheet_title}'!A1:G{len(splits_values)}",
-                valueInputOption='RAW',
-                body={'values': splits_values}
-            ).execute()
-            
-            # Format the sheets
-            self._format_sheets(spreadsheet_id)
-            
+                body={'requests': requests}
+            ))
         except HttpError as error:
-            raise Exception(f"Error populating spreadsheet: {error}")
+            logger.warning("Could not format spreadsheet %s: %s", spreadsheet_id, error)
+        
+        if make_public:
+            self._make_public(spreadsheet_id)
+        
+        return spreadsheet_id
+    
+    def populate_regular_workout(self, spreadsheet_id: str, summary: Summary, 
+                                splits: List[Split], rower_name: str) -> None:
+        """Populate a Google Sheet with regular workout data."""
+        self._populate(spreadsheet_id, *self._regular_values(summary, splits, rower_name))
     
     def populate_interval_workout(self, spreadsheet_id: str, summary: IntervalSummary, 
                                  intervals: List[Interval], rower_name: str) -> None:
         """Populate a Google Sheet with interval workout data."""
+        self._populate(spreadsheet_id, *self._interval_values(summary, intervals, rower_name))
+    
+    def _regular_values(self, summary: Summary, splits: List[Split],
+                        rower_name: str) -> Tuple[List[Sequence[Any]], str, List[Sequence[Any]]]:
+        """Build the summary values, breakdown sheet title and splits values for a regular workout."""
+        # Prepare summary data
+        summary_values: List[Sequence[Any]] = [
+            _SUMMARY_HEADERS,
+            [rower_name, summary.total_distance, summary.total_time, 
+             summary.average_split, summary.average_rate, summary.average_hr, summary.average_watts]
+        ]
+        
+        # Prepare splits data
+        splits_values: List[Sequence[Any]] = [_SPLIT_HEADERS]
+        splits_values.extend(map(_SPLIT_FIELDS, splits))
+        
+        return summary_values, f"{rower_name} Split Breakdown", splits_values
+    
+    def _interval_values(self, summary: IntervalSummary, intervals: List[Interval],
+                         rower_name: str) -> Tuple[List[Sequence[Any]], str, List[Sequence[Any]]]:
+        """Build the summary values, breakdown sheet title and intervals values for an interval workout."""
+        # Prepare summary data
+        summary_values: List[Sequence[Any]] = [
+            _INTERVAL_SUMMARY_HEADERS,
+            [rower_name, summary.total_distance, summary.total_time, 
+             summary.average_split, summary.average_rate, summary.average_hr, summary.average_watts,
+             summary.total_intervals, summary.rest_time or 'N/A']
+        ]
+        
+        # Prepare intervals data
+        intervals_values: List[Sequence[Any]] = [_INTERVAL_HEADERS]
+        intervals_values.extend(
+            (*values[:-1], values[-1] or 'N/A') for values in map(_INTERVAL_FIELDS, intervals)
+        )
+        
+        return summary_values, f"{rower_name} Interval Breakdown", intervals_values
+    
+    def _populate(self, spreadsheet_id: str, summary_values: List[Sequence[Any]],
+                  sheet_title: str, breakdown_values: List[Sequence[Any]]) -> None:
+        """
+        Write the summary and breakdown sheets in a single batchUpdate.
+        
+        The breakdown sheet gets a client-assigned sheetId so the data and
+        formatting requests in the same batch can refer to it.
+        """
         if not self.service:
             self.authenticate()
         
+        breakdown_sheet_id = zlib.crc32(sheet_title.encode()) & 0x7FFFFFFF or 1
+        add_sheet = {
+            'addSheet': {
+                'properties': {
+                    'sheetId': breakdown_sheet_id,
+                    'title': sheet_title
+                }
+            }
+        }
+        
+        # The summary goes on the spreadsheet's default first sheet
+        requests = [add_sheet] + self._sheet_requests(0, summary_values) + \
+            self._sheet_requests(breakdown_sheet_id, breakdown_values)
+        
         try:
-            # Prepare summary data
-            summary_values = [
-                ['Rower', 'Total Distance (m)', 'Total Time', 'Average Split', 'Average Rate (SPM)', 
-                 'Average HR', 'Average Watts', 'Total Intervals', 'Rest Time'],
-                [rower_name, summary.total_distance, summary.total_time, 
-                 summary.average_split, summary.average_rate, summary.average_hr or 'N/A', summary.average_watts or 'N/A',
-                 summary.total_intervals, summary.rest_time or 'N/A']
-            ]
-            
-            # Update summary sheet
-            self.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range='Sheet1!A1:I2',
-                valueInputOption='RAW',
-                body={'values': summary_values}
-            ).execute()
-            
-            # Create intervals breakdown sheet
-            intervals_sheet_title = f"{rower_name} Interval Breakdown"
-            self._add_sheet(spreadsheet_id, intervals_sheet_title)
-            
-            # Prepare intervals data
-            intervals_headers = ['Interval', 'Distance (m)', 'Time', 'Pace', 'Rate (SPM)', 'HR', 'Watts', 'Rest Time']
-            intervals_values = [intervals_headers]
-            
-            for interval in intervals:
-                intervals_values.append([
-                    interval.interval_number,
-                    interval.interval_distance,
-                    interval.interval_time,
-                    interval.interval_pace,
-                    interval.rate,
-                    interval.hr or 'N/A',
-                    interval.watts or 'N/A',
-                    interval.rest_time or 'N/A'
-                ])
-            
-            # Update intervals sheet
-            self.service.spreadsheets().values().update(
+            _execute(self.service.spreadsheets().batchUpdate(
                 spreadsheetId=spreadsheet_id,
-                range=f"'{intervals_sheet_title}'!A1:H{len(intervals_values)}",
-                valueInputOption='RAW',
-                body={'values': intervals_values}
-            ).execute()
-            
-            # Format the sheets
-            self._format_sheets(spreadsheet_id)
-            
+                body={'requests': requests}
+            ))
         except HttpError as error:
-            raise Exception(f"Error populating spreadsheet: {error}")
+            # If the sheet already exists, write into it instead of adding it
+            if not _is_duplicate_sheet_error(error):
+                raise Exception(f"Error populating spreadsheet: {error}")
+            
+            try:
+                existing_sheet_id = self._get_sheet_id(spreadsheet_id, sheet_title)
+                requests = self._sheet_requests(0, summary_values) + \
+                    self._sheet_requests(existing_sheet_id, breakdown_values)
+                _execute(self.service.spreadsheets().batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    body={'requests': requests}
+                ))
+            except HttpError as error:
+                raise Exception(f"Error populating spreadsheet: {error}")
     
-    def _add_sheet(self, spreadsheet_id: str, sheet_title: str) -> None:
-        """Add a new sheet to the spreadsheet."""
-        try:
-            request = {
-                'addSheet': {
-                    'properties': {
-                        'title': sheet_title
-                    }
+    def _get_sheet_id(self, spreadsheet_id: str, sheet_title: str) -> int:
+        """Look up the sheetId of a sheet by its title."""
+        spreadsheet = _execute(self.service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields='sheets.properties(sheetId,title)'
+        ))
+        
+        for sheet in spreadsheet.get('sheets', []):
+            properties = sheet.get('properties', {})
+            if properties.get('title') == sheet_title:
+                sheet_id: int = properties.get('sheetId')
+                return sheet_id
+        
+        raise Exception(f"Error populating spreadsheet: sheet '{sheet_title}' not found")
+    
+    def _sheet_requests(self, sheet_id: int, values: List[Sequence[Any]]) -> List[dict]:
+        """Build the requests that write values to a sheet, bold its header and resize its columns."""
+        return [
+            # Write the values starting at A1
+            {
+                'updateCells': {
+                    'start': {
+                        'sheetId': sheet_id,
+                        'rowIndex': 0,
+                        'columnIndex': 0
+                    },
+                    'rows': _row_data(values),
+                    'fields': 'userEnteredValue'
                 }
             }
-            
-            self.service.spreadsheets().batchUpdate(
-                spreadsheetId=spreadsheet_id,
-                body={'requests': [request]}
-            ).execute()
-            
-        except HttpError as error:
-            # If sheet already exists, that's okay
-            if "already exists" not in str(error):
-                raise Exception(f"Error adding sheet: {error}")
+        ] + self._format_requests(sheet_id, values)
     
-    def _format_sheets(self, spreadsheet_id: str) -> None:
-        """Apply basic formatting to the sheets."""
-        try:
-            # Get sheet properties
-            spreadsheet = self.service.spreadsheets().get(
-                spreadsheetId=spreadsheet_id
-            ).execute()
-            
-            requests = []
-            
-            # Format each sheet
-            for sheet in spreadsheet.get('sheets', []):
-                sheet_id = sheet.get('properties', {}).get('sheetId')
-                
-                # Bold headers
-                requests.append({
-                    'repeatCell': {
-                        'range': {
-                            'sheetId': sheet_id,
-                            'startRowIndex': 0,
-                            'endRowIndex': 1
-                        },
-                        'cell': {
-                            'userEnteredFormat': {
-                                'textFormat': {
-                                    'bold': True
-                                }
+    def _format_requests(self, sheet_id: int, values: Sequence[Sequence[Any]]) -> List[dict]:
+        """Build the requests that format numeric columns, bold a sheet's header and resize its columns."""
+        row_count = len(values)
+        
+        # Number format applied once per numeric column
+        number_formats = [
+            {
+                'repeatCell': {
+                    'range': {
+                        'sheetId': sheet_id,
+                        'startRowIndex': 1,
+                        'endRowIndex': row_count,
+                        'startColumnIndex': col,
+                        'endColumnIndex': col + 1
+                    },
+                    'cell': {
+                        'userEnteredFormat': {
+                            'numberFormat': {
+                                'type': 'NUMBER',
+                                'pattern': pattern
                             }
-                        },
-                        'fields': 'userEnteredFormat.textFormat.bold'
-                    }
-                })
-                
-                # Auto-resize columns
-                requests.append({
-                    'autoResizeDimensions': {
-                        'dimensions': {
-                            'sheetId': sheet_id,
-                            'dimension': 'COLUMNS'
                         }
+                    },
+                    'fields': 'userEnteredFormat.numberFormat'
+                }
+            }
+            for col, pattern in _numeric_columns(values)
+        ]
+        
+        return number_formats + [
+            # Bold headers
+            {
+                'repeatCell': {
+                    'range': {
+                        'sheetId': sheet_id,
+                        'startRowIndex': 0,
+                        'endRowIndex': 1
+                    },
+                    'cell': {
+                        'userEnteredFormat': {
+                            'textFormat': {
+                                'bold': True
+                            }
+                        }
+                    },
+                    'fields': 'userEnteredFormat.textFormat.bold'
+                }
+            },
+            # Auto-resize columns
+            {
+                'autoResizeDimensions': {
+                    'dimensions': {
+                        'sheetId': sheet_id,
+                        'dimension': 'COLUMNS'
                     }
-                })
-            
-            # Apply formatting
-            if requests:
-                self.service.spreadsheets().batchUpdate(
-                    spreadsheetId=spreadsheet_id,
-                    body={'requests': requests}
-                ).execute()
-                
-        except HttpError as error:
-            print(f"Warning: Could not apply formatting: {error}")
\ No newline at end of file
+                }
+            }
+        ]
+
+
+class AsyncGoogleSheetsService:
+    """
+    Asyncio façade over GoogleSheetsService.
+    
+    Blocking API calls run in a thread pool so callers can await them (or
+    gather several) without stalling the event loop.
+    """
+    
+    def __init__(self, credentials_path: Optional[str] = None, token_path: str = "token.json",
+                 max_workers: int = ASYNC_MAX_WORKERS):
+        """Initialize the async service; authentication happens on first use in each worker."""
+        self.credentials_path = credentials_path
+        self.token_path = token_path
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sheets")
+    
+    def generate_sheet_name(self, base_name: Optional[str] = None) -> str:
+        """Generate a sheet name with timestamp."""
+        return GoogleSheetsService.generate_sheet_name(base_name)
+    
+    def get_spreadsheet_url(self, spreadsheet_id: str) -> str:
+        """Get the URL for a Google Spreadsheet."""
+        return GoogleSheetsService.get_spreadsheet_url(spreadsheet_id)
+    
+    async def create_and_populate(self, title: str, summary: Union[Summary, IntervalSummary],
+                                  rows: Union[List[Split], List[Interval]], rower_name: str,
+                                  make_public: bool = False) -> str:
+        """Create a spreadsheet with the workout data already in it."""
+        spreadsheet_id: str = await self._run('create_and_populate', title, summary, rows, rower_name, make_public)
+        return spreadsheet_id
+    
+    async def populate_regular_workout(self, spreadsheet_id: str, summary: Summary,
+                                       splits: List[Split], rower_name: str) -> None:
+        """Populate a Google Sheet with regular workout data."""
+        await self._run('populate_regular_workout', spreadsheet_id, summary, splits, rower_name)
+    
+    async def populate_interval_workout(self, spreadsheet_id: str, summary: IntervalSummary,
+                                        intervals: List[Interval], rower_name: str) -> None:
+        """Populate a Google Sheet with interval workout data."""
+        await self._run('populate_interval_workout', spreadsheet_id, summary, intervals, rower_name)
+    
+    async def aclose(self) -> None:
+        """Shut down the worker threads."""
+        await asyncio.to_thread(self._pool.shutdown)
+    
+    async def _run(self, method: str, *args: Any) -> Any:
+        """Run a GoogleSheetsService method in the pool (API calls retry transient errors themselves)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._call, method, args)
+    
+    def _call(self, method: str, args: tuple) -> Any:
+        """Call a method on a per-call service instance (services are cached per thread)."""
+        service = GoogleSheetsService(self.credentials_path, self.token_path)
+        return getattr(service, method)(*args)
+
+
+def _is_duplicate_sheet_error(error: HttpError) -> bool:
+    """Check whether an addSheet failed because a sheet with that title exists."""
+    # reason is parsed once from the error body when the HttpError is created
+    return error.resp.status == 400 and 'already exists' in (error.reason or '')
+
+
+def _retry(statuses: Tuple[int, ...] = RETRY_STATUSES) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Retry a Google API call on the given statuses with exponential backoff and jitter."""
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            for attempt in range(MAX_RETRIES - 1):
+                try:
+                    return fn(*args, **kwargs)
+                except HttpError as error:
+                    if error.resp.status not in statuses:
+                        raise
+                    # Honour the server's Retry-After when it asks for a longer wait
+                    delay = min(2 ** attempt, 16) + random.random()
+                    delay = max(delay, _retry_after(error) or 0.0)
+                    logger.warning("Google API returned %s, retrying in %.1fs", error.resp.status, delay)
+                    time.sleep(delay)
+            # The last attempt's error is raised as is
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _retry_after(error: HttpError) -> Optional[float]:
+    """Seconds to wait from an error's Retry-After header (delta-seconds or HTTP-date), if any."""
+    value = error.resp.get('retry-after')
+    if not value:
+        return None
+    try:
+        return min(float(value), MAX_RETRY_AFTER)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return min(max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0), MAX_RETRY_AFTER)
+
+
+@_retry()
+def _execute(request: Any) -> Any:
+    """Execute an idempotent Google API request, retrying transient failures."""
+    return request.execute()
+
+
+@_retry(statuses=(429,))
+def _execute_create(request: Any) -> Any:
+    """
+    Execute a request that creates a new resource.
+    
+    Only rate-limit rejections are retried: after a 5xx the server may already
+    have created the resource, and retrying would leave a duplicate behind.
+    """
+    return request.execute()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env() -> None:
+    """Load .env once, on first use rather than at import."""
+    load_dotenv()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_credentials(credentials_path: str, token_path: str, scopes: Tuple[str, ...]) -> Any:
+    """Load credentials once per credentials/token file pair and scope set."""
+    from google.oauth2.service_account import Credentials as ServiceAccountCredentials
+    
+    # Check if this is a service account credentials file
+    with open(credentials_path, 'r') as f:
+        credentials_info = json.load(f)
+    
+    # If it's a service account, use service account credentials
+    if credentials_info.get('type') == 'service_account':
+        return ServiceAccountCredentials.from_service_account_info(
+            credentials_info, scopes=list(scopes))
+    
+    # User tokens are authorized for all scopes up front so one token serves both APIs
+    return _load_user_credentials(credentials_path, token_path)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_user_credentials(credentials_path: str, token_path: str) -> Any:
+    """Load (and if needed authorize) OAuth user credentials once per credentials/token file pair."""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    
+    # Handle OAuth2 credentials (web/installed app)
+    creds = None
+    
+    # Load existing token
+    if os.path.exists(token_path):
+        creds = Credentials.from_authorized_user_file(token_path, GoogleSheetsService.SCOPES)
+    
+    # A token that's still valid (google-auth keeps a refresh margin) is used as is
+    if creds and creds.valid:
+        return creds
+    
+    if creds and creds.expired and creds.refresh_token:
+        creds.refresh(Request())
+        
+        # Persist the refreshed token in the background so it isn't on the request path
+        threading.Thread(target=_save_token, args=(token_path, creds.to_json())).start()
+    else:
+        # If no valid credentials, request authorization
+        flow = InstalledAppFlow.from_client_secrets_file(
+            credentials_path, GoogleSheetsService.SCOPES)
+        creds = flow.run_local_server(port=0)
+        
+        # Save credentials for future use
+        _save_token(token_path, creds.to_json())
+    
+    return creds
+
+
+def _save_token(token_path: str, token_json: str) -> None:
+    """Write OAuth credentials to the token file atomically, so an interrupted write never forces re-auth."""
+    tmp_path = f"{token_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as token:
+            token.write(token_json)
+        os.replace(tmp_path, token_path)
+    except OSError as e:
+        logger.warning("Could not save Google token: %s", e)
+
+
+def _build_service(api: str, credentials_path: str, token_path: str) -> Any:
+    """
+    Get the 'sheets' or 'drive' service for a credentials/token file pair.
+    
+    httplib2 isn't thread-safe, so services are built once per thread; the
+    credentials themselves are shared.
+    """
+    services = getattr(_thread_local, 'services', None)
+    if services is None:
+        services = _thread_local.services = {}
+    
+    key = (api, credentials_path, token_path)
+    if key not in services:
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        from googleapiclient.discovery import build
+        
+        scopes = GoogleSheetsService.SHEETS_SCOPES if api == 'sheets' else GoogleSheetsService.SCOPES
+        
+        # Only one thread may run the (possibly interactive) authorization
+        with _auth_lock:
+            creds = _load_credentials(credentials_path, token_path, tuple(scopes))
+        
+        # A persistent authorized Http keeps its connection alive between calls
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        
+        # Use the discovery documents bundled with googleapiclient instead of fetching them
+        services[key] = build(api, API_VERSIONS[api], http=http, model=_json_model(),
+                              static_discovery=True, cache_discovery=False)
+    return services[key]
+
+
+@functools.lru_cache(maxsize=1)
+def _json_model() -> Any:
+    """
+    Request body model that serializes with orjson when it's installed.
+    
+    Returns None (googleapiclient's default JsonModel) otherwise.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+    from googleapiclient.model import JsonModel
+    
+    class OrjsonModel(JsonModel):
+        """JsonModel with orjson request serialization."""
+        
+        def serialize(self, body_value: Any) -> str:
+            """Serialize a request body to a JSON string."""
+            return orjson.dumps(body_value).decode('utf-8')
+    
+    return OrjsonModel()
+
+
+def _cell_data(value: Any) -> Dict[str, Any]:
+    """Convert a Python value to Sheets CellData, matching RAW value input."""
+    if value is None:
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+    if isinstance(value, (int, float)):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+
+def _row_data(values: Sequence[Sequence[Any]]) -> List[dict]:
+    """Convert rows of Python values to Sheets RowData; empty values become empty cells."""
+    return [{'values': [_cell_data(value) for value in row]} for row in values]
+
+
+def _numeric_columns(values: Sequence[Sequence[Any]]) -> List[Tuple[int, str]]:
+    """Find columns whose data cells are all numbers (or empty), with a number format pattern for each."""
+    columns = []
+    for col in range(len(values[0])):
+        cells = [row[col] for row in values[1:] if col < len(row) and row[col] is not None]
+        if cells and all(isinstance(cell, (int, float)) and not isinstance(cell, bool) for cell in cells):
+            columns.append((col, '0.0' if any(isinstance(cell, float) for cell in cells) else '0'))
+    return columns
+
+
+def _sheet_with_data(sheet_id: int, title: str, values: Sequence[Sequence[Any]]) -> dict:
+    """Build a Sheet resource holding its values (formatting is applied separately)."""
+    return {
+        'properties': {
+            'sheetId': sheet_id,
+            'title': title
+        },
+        'data': [{
+            'startRow': 0,
+            'startColumn': 0,
+            'rowData': _row_data(values)
+        }]
+    }
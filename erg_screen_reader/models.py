@@ -1,52 +1,59 @@
 from pydantic import BaseModel, computed_field
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, List, Optional
 import re
 
+# [[h:]m:]s[.fraction], e.g. "2:05.1", "1:25", "1:02:03.4"
+_TIME_RE = re.compile(r'(?:(?:(\d+):)?(\d+):)?(\d+)(?:\.(\d+))?')
+
 def time_to_seconds(time_str: str) -> float:
     """Convert time string (e.g., '2:05.1') to seconds."""
     try:
-        # Handle formats like "2:05.1", "2:05", "1:25.4"
-        if '.' in time_str:
-            main_part, decimal_part = time_str.split('.')
-            decimal_seconds = float(f"0.{decimal_part}")
-        else:
-            main_part = time_str
-            decimal_seconds = 0.0
-        
-        if ':' in main_part:
-            parts = main_part.split(':')
-            if len(parts) == 2:
-                minutes, seconds = parts
-                total_seconds = int(minutes) * 60 + int(seconds) + decimal_seconds
-            else:
-                # Handle unexpected format
-                total_seconds = float(time_str.replace(':', ''))
-        else:
-            total_seconds = float(main_part) + decimal_seconds
-        
-        return total_seconds
-    except (ValueError, AttributeError):
+        match = _TIME_RE.fullmatch(time_str.strip())
+    except AttributeError:
         return 0.0
+    if not match:
+        return 0.0
+    
+    hours, minutes, seconds, fraction = match.groups()
+    total_seconds = int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(seconds)
+    if fraction:
+        total_seconds += int(fraction) / 10 ** len(fraction)
+    return float(total_seconds)
 
 def calculate_watts(pace_time: str, distance: int) -> Optional[float]:
     """Calculate watts using formula: watts = 2.80/pace^3 where pace = time_in_seconds/distance_in_meters."""
-    try:
-        if not pace_time or distance <= 0:
-            return None
-        
-        time_seconds = time_to_seconds(pace_time)
-        if time_seconds <= 0:
-            return None
-        
-        # Calculate pace as time per meter
-        pace = time_seconds / distance
-        
-        # Apply the watts formula: watts = 2.80/pace^3
-        watts = 2.80 / (pace ** 3)
-        
-        return round(watts, 1)
-    except (ValueError, ZeroDivisionError):
+    if not pace_time or distance <= 0:
         return None
+    
+    time_seconds = time_to_seconds(pace_time)
+    if time_seconds <= 0:
+        return None
+    
+    # 2.80/pace^3 rearranged to 2.80 * distance^3 / time^3 (one division)
+    return round(2.80 * distance * distance * distance / (time_seconds * time_seconds * time_seconds), 1)
+
+class _CumulativeDistanceMixin:
+    """Post-processing shared by workouts whose splits/intervals carry cumulative distances."""
+    
+    if TYPE_CHECKING:
+        summary: Any
+    
+    def _finalize_rows(self, rows: list, distance_attr: str, set_actual_distance: str) -> None:
+        """Set each row's actual distance (current - previous cumulative) and the summary's average watts in one pass."""
+        prev_distance = 0
+        total_watts = 0.0
+        watts_count = 0
+        for row in rows:
+            distance = getattr(row, distance_attr)
+            getattr(row, set_actual_distance)(distance - prev_distance)
+            prev_distance = distance
+            
+            if row.watts is not None:
+                total_watts += row.watts
+                watts_count += 1
+        
+        if watts_count:
+            self.summary.average_watts = round(total_watts / watts_count, 1)
 
 class Summary(BaseModel):
     total_distance: int
@@ -64,72 +71,39 @@ class Split(BaseModel):
     rate: int
     hr: Optional[int] = None
     _actual_split_distance: Optional[int] = None  # Will be set by ErgData
+    _watts: Optional[float] = None  # Calculated alongside the actual split distance
     
     def set_actual_split_distance(self, distance: int) -> None:
         """Set the actual split distance (current - previous cumulative distance)."""
         self._actual_split_distance = distance
+        self._watts = calculate_watts(self.split_pace, distance)
     
     @computed_field
     @property
     def watts(self) -> Optional[float]:
         """Calculate watts from split pace and actual split distance."""
-        # Use the actual split distance if set, otherwise fall back to assuming 500m
-        distance = self._actual_split_distance if self._actual_split_distance is not None else 500
-        return calculate_watts(self.split_pace, distance)
+        # Calculated once when the actual split distance is set
+        if self._actual_split_distance is not None:
+            return self._watts
+        
+        # Otherwise fall back to assuming 500m
+        return calculate_watts(self.split_pace, 500)
 
-class ErgData(BaseModel):
+class ErgData(_CumulativeDistanceMixin, BaseModel):
     summary: Summary
     splits: List[Split]
     
-    def __post_init__(self):
-        """Calculate actual split distances after initialization."""
-        self._calculate_actual_split_distances()
-    
-    def model_post_init(self, __context) -> None:
-        """Calculate actual split distances after Pydantic initialization."""
-        self._calculate_actual_split_distances()
-    
-    def _calculate_actual_split_distances(self) -> None:
-        """Calculate actual split distances (current - previous cumulative distance)."""
-        prev_distance = 0
-        for split in self.splits:
-            actual_distance = split.split_distance - prev_distance
-            split.set_actual_split_distance(actual_distance)
-            prev_distance = split.split_distance
-        
-        # Calculate average watts after setting split distances
-        self._calculate_average_watts()
-    
-    def _calculate_average_watts(self) -> None:
-        """Calculate average watts from all splits."""
-        watts_values = [split.watts for split in self.splits if split.watts is not None]
-        if watts_values:
-            self.summary.average_watts = round(sum(watts_values) / len(watts_values), 1)
+    def model_post_init(self, __context: Any) -> None:
+        """Calculate actual split distances and average watts after Pydantic initialization."""
+        self._finalize_rows(self.splits, 'split_distance', 'set_actual_split_distance')
 
-class ReceiptDetails(BaseModel):
+class ReceiptDetails(_CumulativeDistanceMixin, BaseModel):
     summary: Summary
     splits: List[Split]
     
-    def model_post_init(self, __context) -> None:
-        """Calculate actual split distances after Pydantic initialization."""
-        self._calculate_actual_split_distances()
-    
-    def _calculate_actual_split_distances(self) -> None:
-        """Calculate actual split distances (current - previous cumulative distance)."""
-        prev_distance = 0
-        for split in self.splits:
-            actual_distance = split.split_distance - prev_distance
-            split.set_actual_split_distance(actual_distance)
-            prev_distance = split.split_distance
-        
-        # Calculate average watts after setting split distances
-        self._calculate_average_watts()
-    
-    def _calculate_average_watts(self) -> None:
-        """Calculate average watts from all splits."""
-        watts_values = [split.watts for split in self.splits if split.watts is not None]
-        if watts_values:
-            self.summary.average_watts = round(sum(watts_values) / len(watts_values), 1)
+    def model_post_init(self, __context: Any) -> None:
+        """Calculate actual split distances and average watts after Pydantic initialization."""
+        self._finalize_rows(self.splits, 'split_distance', 'set_actual_split_distance')
 
 # New models for interval workouts
 class IntervalSummary(BaseModel):
@@ -151,65 +125,36 @@ class Interval(BaseModel):
     hr: Optional[int] = None
     rest_time: Optional[str] = None
     _actual_interval_distance: Optional[int] = None  # Will be set by IntervalWorkoutData
+    _watts: Optional[float] = None  # Calculated alongside the actual interval distance
     
     def set_actual_interval_distance(self, distance: int) -> None:
         """Set the actual interval distance (current - previous cumulative distance)."""
         self._actual_interval_distance = distance
+        self._watts = calculate_watts(self.interval_pace, distance)
     
     @computed_field
     @property
     def watts(self) -> Optional[float]:
         """Calculate watts from interval pace and actual interval distance."""
-        # Use the actual interval distance if set, otherwise fall back to using the stored distance
-        distance = self._actual_interval_distance if self._actual_interval_distance is not None else self.interval_distance
-        return calculate_watts(self.interval_pace, distance)
+        # Calculated once when the actual interval distance is set
+        if self._actual_interval_distance is not None:
+            return self._watts
+        
+        # Otherwise fall back to using the stored distance
+        return calculate_watts(self.interval_pace, self.interval_distance)
 
-class IntervalWorkoutData(BaseModel):
+class IntervalWorkoutData(_CumulativeDistanceMixin, BaseModel):
     summary: IntervalSummary
     intervals: List[Interval]
     
-    def model_post_init(self, __context) -> None:
-        """Calculate actual interval distances after Pydantic initialization."""
-        self._calculate_actual_interval_distances()
-    
-    def _calculate_actual_interval_distances(self) -> None:
-        """Calculate actual interval distances (current - previous cumulative distance)."""
-        prev_distance = 0
-        for interval in self.intervals:
-            actual_distance = interval.interval_distance - prev_distance
-            interval.set_actual_interval_distance(actual_distance)
-            prev_distance = interval.interval_distance
-        
-        # Calculate average watts after setting interval distances
-        self._calculate_average_watts()
-    
-    def _calculate_average_watts(self) -> None:
-        """Calculate average watts from all intervals."""
-        watts_values = [interval.watts for interval in self.intervals if interval.watts is not None]
-        if watts_values:
-            self.summary.average_watts = round(sum(watts_values) / len(watts_values), 1)
+    def model_post_init(self, __context: Any) -> None:
+        """Calculate actual interval distances and average watts after Pydantic initialization."""
+        self._finalize_rows(self.intervals, 'interval_distance', 'set_actual_interval_distance')
 
-class IntervalReceiptDetails(BaseModel):
+class IntervalReceiptDetails(_CumulativeDistanceMixin, BaseModel):
     summary: IntervalSummary
     intervals: List[Interval]
     
-    def model_post_init(self, __context) -> None:
-        """Calculate actual interval distances after Pydantic initialization."""
-        self._calculate_actual_interval_distances()
-    
-    def _calculate_actual_interval_distances(self) -> None:
-        """Calculate actual interval distances (current - previous cumulative distance)."""
-        prev_distance = 0
-        for interval in self.intervals:
-            actual_distance = interval.interval_distance - prev_distance
-            interval.set_actual_interval_distance(actual_distance)
-            prev_distance = interval.interval_distance
-        
-        # Calculate average watts after setting interval distances
-        self._calculate_average_watts()
-    
-    def _calculate_average_watts(self) -> None:
-        """Calculate average watts from all intervals."""
-        watts_values = [interval.watts for interval in self.intervals if interval.watts is not None]
-        if watts_values:
-            self.summary.average_watts = round(sum(watts_values) / len(watts_values), 1)
\ No newline at end of file
+    def model_post_init(self, __context: Any) -> None:
+        """Calculate actual interval distances and average watts after Pydantic initialization."""
+        self._finalize_rows(self.intervals, 'interval_distance', 'set_actual_interval_distance')
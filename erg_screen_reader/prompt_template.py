@@ -1,8 +1,12 @@
+# Bump whenever a prompt changes so cached extraction results are invalidated
+PROMPT_VERSION = "2"
+
+# Prompts are sent as the request instructions, ahead of the image, so the
+# identical prefix can be served from OpenAI's prompt cache
+
 # Basic prompt for the OpenAI responses.parse method
 BASIC_PROMPT = """
-You are an expert at reading rowing ergometer screen images and extracting workout data.
-
-Given the attached erg screen image, extract the following structured data:
+Extract workout data from the attached rowing ergometer screen image:
 
 1. Summary information:
    - total_distance: The total distance rowed (in meters, as integer)
@@ -19,15 +23,11 @@ Given the attached erg screen image, extract the following structured data:
      - split_pace: The pace for this split (in MM:SS.S format)
      - rate: The stroke rate for this split (strokes per minute, as integer)
      - hr: The heart rate for this split (if available, as integer)
-
-Please extract all visible data from the ergometer screen image accurately.
 """
 
 # Interval workout prompt
 INTERVAL_PROMPT = """
-You are an expert at reading rowing ergometer screen images and extracting interval workout data.
-
-Given the attached erg screen image, extract the following structured data:
+Extract interval workout data from the attached rowing ergometer screen image:
 
 1. Summary information:
    - total_distance: The total distance rowed across all intervals (in meters, as integer)
@@ -47,6 +47,4 @@ Given the attached erg screen image, extract the following structured data:
      - rate: The stroke rate for this interval (strokes per minute, as integer)
      - hr: The heart rate for this interval (if available, as integer)
      - rest_time: The rest time after this interval (if available)
-
-Please extract all visible data from the ergometer screen image accurately, distinguishing between regular splits and interval workouts.
 """
\ No newline at end of file
@@ -2,30 +2,142 @@
 FastAPI web interface for Erg Screen Reader.
 """
 
+import asyncio
+import hashlib
 import os
-import tempfile
+import stat
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional, Tuple, Type
+from urllib.parse import quote
 
 from fastapi import FastAPI, File, UploadFile, Form, Request, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import uvicorn
 
 from erg_screen_reader.core import ErgScreenReader, validate_environment
-from erg_screen_reader.google_sheets_service import GoogleSheetsService
+from erg_screen_reader.google_sheets_service import AsyncGoogleSheetsService
+
+try:
+    # orjson serializes response bodies several times faster than stdlib json
+    import orjson
+
+    class OrjsonResponse(JSONResponse):
+        """JSON response rendered with orjson."""
+
+        def render(self, content: Any) -> bytes:
+            """Serialize content to JSON bytes."""
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+    DEFAULT_RESPONSE_CLASS: Type[JSONResponse] = OrjsonResponse
+except ImportError:
+    DEFAULT_RESPONSE_CLASS = JSONResponse
 
 # Get the project root directory
 project_root = Path(__file__).parent.parent
 
+
+class WorkbookAwareGZipMiddleware(GZipMiddleware):
+    """Gzip responses, except workbook downloads which are already zip-compressed."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith("/download/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+class UploadTooLarge(HTTPException):
+    """Raised while a request body is streaming in once it exceeds the size limit."""
+
+    def __init__(self) -> None:
+        super().__init__(status_code=413, detail="File too large")
+
+
+class UploadSizeLimitMiddleware:
+    """Reject request bodies larger than max_size with 413 before they are parsed."""
+
+    def __init__(self, app: ASGIApp, max_size: int) -> None:
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Declared size: refuse without reading any of the body
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_size:
+            await upload_too_large_response()(scope, receive, send)
+            return
+        
+        # Chunked (or understated) bodies are counted as they stream in
+        received = 0
+        
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # Re-raised through FastAPI's body parsing and answered by upload_too_large()
+                    raise UploadTooLarge()
+            return message
+        
+        await self.app(scope, limited_receive, send)
+
+
+def upload_too_large_response() -> JSONResponse:
+    """413 response in the same shape as the app's other errors."""
+    return DEFAULT_RESPONSE_CLASS(
+        status_code=413,
+        content={"success": False, "error": "File too large"}
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Create the reader and Sheets service once and share them across requests."""
+    # The index page has no per-request context, so render it once up front
+    app.state.index_html = templates.get_template("index.html").render()
+    app.state.reader = ErgScreenReader()
+    app.state.sheets = AsyncGoogleSheetsService()
+    try:
+        yield
+    finally:
+        await app.state.sheets.aclose()
+        await app.state.reader.aclose()
+
+
 app = FastAPI(
     title="Erg Screen Reader",
     description="A tool for extracting structured workout data from rowing ergometer screen images",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=DEFAULT_RESPONSE_CLASS
 )
 
+# Largest accepted request body; oversize uploads are refused before the multipart parser runs
+MAX_UPLOAD_SIZE = 16 * 1024 * 1024
+app.add_middleware(UploadSizeLimitMiddleware, max_size=MAX_UPLOAD_SIZE)
+
+
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large(request: Request, exc: UploadTooLarge) -> JSONResponse:
+    """Answer bodies that outgrow the limit mid-stream like those refused up front."""
+    return upload_too_large_response()
+
+
+# Compress JSON, HTML and static assets for slow client links
+app.add_middleware(WorkbookAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Mount static files and templates
 app.mount("/static", StaticFiles(directory=project_root / "static"), name="static")
 templates = Jinja2Templates(directory=project_root / "templates")
@@ -36,26 +148,87 @@ OUTPUT_FOLDER = project_root / "outputs"
 UPLOAD_FOLDER.mkdir(exist_ok=True)
 OUTPUT_FOLDER.mkdir(exist_ok=True)
 
+# Size of the chunks uploads are streamed to disk in
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Excel writer for reports (set ERG_EXCEL_WRITER=xlsxwriter for the streaming writer)
+EXCEL_WRITER = os.getenv("ERG_EXCEL_WRITER", "openpyxl")
+
+# When set (e.g. "/protected-outputs/"), downloads are handed to nginx via X-Accel-Redirect
+ACCEL_REDIRECT_PREFIX = os.getenv("ERG_ACCEL_REDIRECT_PREFIX")
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
 # Allowed file extensions
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'})
+
+
+def split_filename(filename: str) -> Tuple[str, str]:
+    """Split an uploaded filename into its base name stem and extension (without the dot)."""
+    # Drop any client-supplied directory components
+    filename = os.path.basename(filename.replace('\\', '/'))
+    dot = filename.rfind('.')
+    if dot < 0:
+        return filename, ''
+    return filename[:dot], filename[dot + 1:]
+
+
+def allowed_extension(ext: str) -> bool:
+    """Check if a file extension is one of the allowed image types."""
+    return ext.lower() in ALLOWED_EXTENSIONS
 
 
-def allowed_file(filename: str) -> bool:
-    """Check if the uploaded file has an allowed extension."""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def save_upload(source: BinaryIO, file_path: Path) -> str:
+    """Copy an uploaded file to disk in chunks, returning its SHA-256 hex digest."""
+    # Hashing while copying saves the reader a second pass over the file
+    hasher = hashlib.sha256()
+    with open(file_path, "wb") as f:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+            f.write(chunk)
+    return hasher.hexdigest()
 
 
-def get_unique_filename(original_filename: str) -> str:
+def make_file_stamp() -> str:
+    """Generate a timestamp with a random suffix so files from the same second don't collide."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def get_unique_filename(stem: str, ext: str, stamp: Optional[str] = None) -> str:
     """Generate a unique filename to avoid conflicts."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    name, ext = os.path.splitext(original_filename)
-    return f"{name}_{timestamp}{ext}"
+    return f"{stem}_{stamp or make_file_stamp()}.{ext}"
 
 
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request):
+async def index(request: Request) -> HTMLResponse:
     """Serve the main web interface."""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(content=request.app.state.index_html)
+
+
+async def create_sheet(sheets_service: AsyncGoogleSheetsService, summary: Any,
+                       rows: list, name: str, sheet_name: Optional[str],
+                       make_public: bool = False) -> Dict[str, str]:
+    """Create and populate a Google Sheet (shared publicly only if asked), returning its URL."""
+    sheet_name_final = sheet_name or sheets_service.generate_sheet_name(name)
+    
+    spreadsheet_id = await sheets_service.create_and_populate(
+        sheet_name_final, summary, rows, name, make_public=make_public
+    )
+    return {"sheet_url": sheets_service.get_spreadsheet_url(spreadsheet_id)}
+
+
+async def create_excel(reader: ErgScreenReader, workout_type: str, summary: Any,
+                       rows: list, name: str, stamp: str) -> Dict[str, str]:
+    """Write an Excel report to the outputs folder, returning its filename."""
+    output_filename = f"erg_workout_{stamp}.xlsx"
+    output_path = OUTPUT_FOLDER / output_filename
+    
+    create_report = (reader.create_interval_excel_report if workout_type == "interval"
+                     else reader.create_excel_report)
+    
+    # Workbook writes are blocking, so run them on a worker thread
+    await asyncio.to_thread(create_report, summary, rows, str(output_path), name, EXCEL_WRITER)
+    return {"output_filename": output_filename}
 
 
 @app.post("/upload")
@@ -69,9 +242,12 @@ async def upload_file(
     existing_filename: Optional[str] = Form(None),
     sheet_action: Optional[str] = Form(None),
     sheet_name: Optional[str] = Form(None),
-    sheet_url: Optional[str] = Form(None)
-):
+    sheet_url: Optional[str] = Form(None),
+    make_public: bool = Form(False),
+    autocrop: bool = Form(False)
+) -> JSONResponse:
     """Handle file upload and processing."""
+    file_path = None
     
     try:
         # Validate environment
@@ -79,159 +255,152 @@ async def upload_file(
         
         # Validate file
         if not file.filename:
-            return JSONResponse(
+            return DEFAULT_RESPONSE_CLASS(
                 status_code=400,
                 content={"success": False, "error": "No file selected"}
             )
         
-        if not allowed_file(file.filename):
-            return JSONResponse(
+        # Parse the name once for both the extension check and the saved filename
+        stem, ext = split_filename(file.filename)
+        if not allowed_extension(ext):
+            return DEFAULT_RESPONSE_CLASS(
                 status_code=400,
                 content={"success": False, "error": "Invalid file type"}
             )
         
         # Save uploaded file
-        unique_filename = get_unique_filename(file.filename)
+        # One stamp per request names both the upload and its report
+        stamp = make_file_stamp()
+        unique_filename = get_unique_filename(stem, ext, stamp)
         file_path = UPLOAD_FOLDER / unique_filename
         
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Stream to disk in chunks on a worker thread so the event loop isn't blocked
+        image_sha256 = await asyncio.to_thread(save_upload, file.file, file_path)
         
-        # Initialize the reader
-        reader = ErgScreenReader()
+        # Shared reader and Sheets service (created in lifespan)
+        reader = request.app.state.reader
+        sheets_service = request.app.state.sheets
         
         # Process the image based on workout type
         if workout_type == "interval":
-            receipt_details = await reader.extract_interval_workout_data_ai(str(file_path))
+            receipt_details = await reader.extract_interval_workout_data_ai(
+                str(file_path), autocrop=autocrop, image_sha256=image_sha256
+            )
             summary = receipt_details.summary
-            intervals = list(receipt_details.intervals)
+            rows = receipt_details.intervals
+            label = "Interval"
             
-            # Convert to dict for JSON response
-            data = {
-                "workout_type": "interval",
-                "summary": summary.model_dump(),
-                "intervals": [interval.model_dump() for interval in intervals]
-            }
-            
-            # Generate report based on output format
-            if output_format == "sheets":
-                sheets_service = GoogleSheetsService()
-                sheet_name_final = sheet_name or sheets_service.generate_sheet_name(name)
-                
-                spreadsheet_id = sheets_service.create_spreadsheet(sheet_name_final)
-                sheets_service.populate_interval_workout(spreadsheet_id, summary, intervals, name)
-                sheet_url_final = sheets_service.get_spreadsheet_url(spreadsheet_id)
-                
-                return JSONResponse(content={
-                    "success": True,
-                    "data": data,
-                    "sheet_url": sheet_url_final,
-                    "message": "Interval workout processed successfully and Google Sheet created"
-                })
-            else:
-                # Excel output
-                output_filename = f"erg_workout_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                output_path = OUTPUT_FOLDER / output_filename
-                
-                reader.create_interval_excel_report(summary, intervals, str(output_path), name)
-                
-                return JSONResponse(content={
-                    "success": True,
-                    "data": data,
-                    "output_filename": output_filename,
-                    "message": "Interval workout processed successfully"
-                })
+            # Convert to dict for JSON response (one dump covers summary and intervals)
+            data = {"workout_type": "interval", **receipt_details.model_dump()}
         
         else:  # Regular workout
-            receipt_details = await reader.extract_workout_data_ai(str(file_path))
+            receipt_details = await reader.extract_workout_data_ai(
+                str(file_path), autocrop=autocrop, image_sha256=image_sha256
+            )
             summary = receipt_details.summary
-            splits = list(receipt_details.splits)
-            
-            # Convert to dict for JSON response
-            data = {
-                "workout_type": "regular",
-                "summary": summary.model_dump(),
-                "splits": [split.model_dump() for split in splits]
-            }
+            rows = receipt_details.splits
+            label = "Regular"
             
-            # Generate report based on output format
-            if output_format == "sheets":
-                sheets_service = GoogleSheetsService()
-                sheet_name_final = sheet_name or sheets_service.generate_sheet_name(name)
-                
-                spreadsheet_id = sheets_service.create_spreadsheet(sheet_name_final)
-                sheets_service.populate_regular_workout(spreadsheet_id, summary, splits, name)
-                sheet_url_final = sheets_service.get_spreadsheet_url(spreadsheet_id)
-                
-                return JSONResponse(content={
-                    "success": True,
-                    "data": data,
-                    "sheet_url": sheet_url_final,
-                    "message": "Regular workout processed successfully and Google Sheet created"
-                })
-            else:
-                # Excel output
-                output_filename = f"erg_workout_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                output_path = OUTPUT_FOLDER / output_filename
-                
-                reader.create_excel_report(summary, splits, str(output_path), name)
-                
-                return JSONResponse(content={
-                    "success": True,
-                    "data": data,
-                    "output_filename": output_filename,
-                    "message": "Regular workout processed successfully"
-                })
+            # Convert to dict for JSON response (one dump covers summary and splits)
+            data = {"workout_type": "regular", **receipt_details.model_dump()}
+        
+        # Generate report(s) based on output format ("both" writes them concurrently)
+        reports = []
+        if output_format in ("sheets", "both"):
+            reports.append(create_sheet(sheets_service, summary, rows, name, sheet_name, make_public))
+        if output_format != "sheets":
+            reports.append(create_excel(reader, workout_type, summary, rows, name, stamp))
+        
+        content = {"success": True, "data": data}
+        for result in await asyncio.gather(*reports):
+            content.update(result)
+        
+        message = f"{label} workout processed successfully"
+        if "sheet_url" in content:
+            message += " and Google Sheet created"
+        content["message"] = message
+        
+        return DEFAULT_RESPONSE_CLASS(content=content)
     
     except Exception as e:
-        return JSONResponse(
+        return DEFAULT_RESPONSE_CLASS(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
+    
+    finally:
+        # The upload is only needed while processing; results are cached by content hash
+        if file_path is not None:
+            file_path.unlink(missing_ok=True)
 
 
 @app.get("/download/{filename}")
-async def download_file(filename: str):
+async def download_file(filename: str) -> Response:
     """Download generated Excel files."""
     file_path = OUTPUT_FOLDER / filename
     
-    if not file_path.exists():
+    # Stat once and hand the result to FileResponse so it doesn't stat again
+    try:
+        stat_result = file_path.stat()
+    except OSError:
         raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    # Let the reverse proxy send the file itself, keeping Python out of the data path
+    if ACCEL_REDIRECT_PREFIX:
+        return Response(
+            media_type=XLSX_MEDIA_TYPE,
+            headers={
+                "X-Accel-Redirect": f"{ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(filename)}",
+                "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}"
+            }
+        )
     
+    # FileResponse sends the file via the server's pathsend extension (zero-copy)
+    # when available, otherwise streams it in chunks; it also honours Range and
+    # If-Modified-Since/If-None-Match requests
     return FileResponse(
         path=str(file_path),
         filename=filename,
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        stat_result=stat_result,
+        media_type=XLSX_MEDIA_TYPE
     )
 
 
 @app.get("/files")
-async def list_files():
+async def list_files() -> JSONResponse:
     """List available files for selection."""
     try:
-        files = []
-        for file_path in OUTPUT_FOLDER.glob("*.xlsx"):
-            stat = file_path.stat()
-            files.append({
-                "name": file_path.name,
-                "size": stat.st_size,
-                "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-            })
+        # A single scandir pass; stat results come from the directory read where possible
+        entries = []
+        with os.scandir(OUTPUT_FOLDER) as it:
+            for entry in it:
+                if entry.name.endswith(".xlsx") and entry.is_file():
+                    entries.append((entry.name, entry.stat()))
         
         # Sort by modification time (newest first)
-        files.sort(key=lambda x: x["modified"], reverse=True)
+        entries.sort(key=lambda item: item[1].st_mtime, reverse=True)
+        
+        files = [
+            {
+                "name": name,
+                "size": file_stat.st_size,
+                "modified": datetime.fromtimestamp(file_stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+            }
+            for name, file_stat in entries
+        ]
         
-        return JSONResponse(content={"files": files})
+        return DEFAULT_RESPONSE_CLASS(content={"files": files})
     
     except Exception as e:
-        return JSONResponse(
+        return DEFAULT_RESPONSE_CLASS(
             status_code=500,
             content={"error": str(e)}
         )
 
 
-def main():
+def main() -> None:
     """Main entry point for the web server."""
     print("🚣 Erg Screen Reader Web Interface")
     print("=" * 40)
@@ -249,11 +418,18 @@ def main():
     print("⏹️  Press Ctrl+C to stop the server")
     print("-" * 40)
     
+    # loop/http "auto" pick uvloop and httptools (installed with uvicorn[standard])
+    # where the platform supports them. One worker by default: the app is I/O bound,
+    # and each worker has its own ERG_MAX_CONCURRENT_REQUESTS limit on OpenAI calls,
+    # so WEB_CONCURRENCY workers multiply it
     uvicorn.run(
         "erg_screen_reader.web:app",
         host="0.0.0.0",
         port=8080,
-        reload=False
+        reload=False,
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
     )
 
 
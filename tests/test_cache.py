@@ -0,0 +1,71 @@
+"""
+Tests for the on-disk extraction result cache.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from erg_screen_reader.cache import ResultCache
+
+
+def test_round_trip(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    key = ResultCache.make_key("abc", "gpt-4o", "2", "ReceiptDetails")
+
+    assert cache.get(key) is None
+    cache.set(key, '{"summary": {}}')
+    assert cache.get(key) == '{"summary": {}}'
+
+    # A fresh instance over the same directory sees the entry; no temp files are left behind
+    assert ResultCache(tmp_path / "cache").get(key) == '{"summary": {}}'
+    assert [path.name for path in (tmp_path / "cache").iterdir()] == [f"{key}.json"]
+
+
+def test_keys_cover_everything_that_shapes_the_result():
+    base = ResultCache.make_key("abc", "gpt-4o", "2", "ReceiptDetails")
+
+    assert base == ResultCache.make_key("abc", "gpt-4o", "2", "ReceiptDetails")
+    assert base != ResultCache.make_key("abd", "gpt-4o", "2", "ReceiptDetails")
+    assert base != ResultCache.make_key("abc", "gpt-4o-mini", "2", "ReceiptDetails")
+    assert base != ResultCache.make_key("abc", "gpt-4o", "3", "ReceiptDetails")
+    assert base != ResultCache.make_key("abc", "gpt-4o", "2", "IntervalReceiptDetails")
+    assert base != ResultCache.make_key("abc", "gpt-4o", "2", "ReceiptDetails", preprocessing="autocrop")
+    assert ResultCache.make_upload_key("abc") != ResultCache.make_upload_key("abc", preprocessing="autocrop")
+    assert ResultCache.make_upload_key("abc") != base
+
+
+def test_key_parts_do_not_run_together():
+    assert ResultCache.make_key("abc", "gpt-4o", "12", "ReceiptDetails") != \
+        ResultCache.make_key("abc", "gpt-4o1", "2", "ReceiptDetails")
+    assert ResultCache.make_upload_key("abc", "") != ResultCache.make_upload_key("ab", "c")
+
+
+def test_concurrent_writes_leave_one_complete_entry(tmp_path):
+    cache = ResultCache(tmp_path)
+    values = [str(i) * 10000 for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda value: cache.set("key", value), values))
+
+    assert cache.get("key") in values
+    assert [path.name for path in tmp_path.iterdir()] == ["key.json"]
+
+
+def test_cache_dir_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("ERG_CACHE_DIR", str(tmp_path / "env-cache"))
+
+    assert ResultCache().cache_dir == tmp_path / "env-cache"
+    assert ResultCache(tmp_path / "explicit").cache_dir == tmp_path / "explicit"
+
+
+def test_write_failure_is_logged_not_raised(tmp_path, caplog):
+    # A file where the cache directory should be makes every write fail
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    cache = ResultCache(blocker)
+
+    with caplog.at_level(logging.WARNING, logger="erg_screen_reader.cache"):
+        cache.set("key", "value")
+
+    assert cache.get("key") is None
+    assert "Could not write cache entry" in caplog.text
@@ -0,0 +1,59 @@
+"""
+Tests for the CLI processing pipeline.
+"""
+
+import argparse
+import asyncio
+
+from erg_screen_reader import cli
+
+
+class FakeReader:
+    """Reader that records calls instead of contacting OpenAI or writing workbooks."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def extract_all(self, image_path, **kwargs):
+        self.calls.append(("extract_all", image_path))
+        return "regular-data", "interval-data"
+
+    async def extract_workout_data_ai(self, image_path, **kwargs):
+        self.calls.append(("regular", image_path))
+        return "regular-data"
+
+    async def aclose(self):
+        self.calls.append(("aclose",))
+
+
+def _args(**overrides):
+    defaults = {"image_path": ["a.png", "b.png"], "workout_type": "regular", "no_cache": False,
+                "autocrop": False, "concurrency": 2}
+    return argparse.Namespace(**{**defaults, **overrides})
+
+
+def _run(monkeypatch, args):
+    reader = FakeReader()
+    written = []
+    monkeypatch.setattr(cli, "ErgScreenReader", lambda: reader)
+    monkeypatch.setattr(cli, "validate_environment", lambda: None)
+    monkeypatch.setattr(cli, "write_output",
+                        lambda _reader, details, _args, workout_type: written.append((workout_type, details)))
+    failures = asyncio.run(cli.run(args))
+    return failures, reader.calls, written
+
+
+def test_both_uses_extract_all_and_writes_both_reports(monkeypatch):
+    failures, calls, written = _run(monkeypatch, _args(workout_type="both"))
+
+    assert failures == 0
+    assert calls == [("extract_all", "a.png"), ("extract_all", "b.png"), ("aclose",)]
+    assert written == [("regular", "regular-data"), ("interval", "interval-data")] * 2
+
+
+def test_single_workout_type(monkeypatch):
+    failures, calls, written = _run(monkeypatch, _args())
+
+    assert failures == 0
+    assert calls == [("regular", "a.png"), ("regular", "b.png"), ("aclose",)]
+    assert written == [("regular", "regular-data")] * 2
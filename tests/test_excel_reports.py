@@ -0,0 +1,103 @@
+"""
+Tests for the openpyxl and xlsxwriter Excel report writers.
+"""
+
+import openpyxl
+import pytest
+
+from erg_screen_reader.core import ErgScreenReader
+from erg_screen_reader.models import IntervalReceiptDetails, ReceiptDetails
+
+pytest.importorskip("xlsxwriter")
+
+
+@pytest.fixture
+def reader():
+    # Report writing never calls OpenAI, so skip creating a client (and needing an API key)
+    return ErgScreenReader.__new__(ErgScreenReader)
+
+
+@pytest.fixture
+def workout():
+    return ReceiptDetails.model_validate({
+        "summary": {"total_distance": 1000, "total_time": "4:00.0", "average_split": "2:00.0",
+                    "average_rate": 24, "average_hr": 150},
+        "splits": [
+            {"split_number": "1", "split_distance": 500, "split_time": "2:00.0",
+             "split_pace": "2:00.0", "rate": 24, "hr": 148},
+            {"split_number": "2", "split_distance": 1000, "split_time": "2:00.0",
+             "split_pace": "2:00.0", "rate": 24},
+        ],
+    })
+
+
+@pytest.fixture
+def interval_workout():
+    return IntervalReceiptDetails.model_validate({
+        "summary": {"total_distance": 1000, "total_time": "3:20.0", "average_split": "1:40.0",
+                    "average_rate": 30, "total_intervals": 2, "rest_time": "1:00"},
+        "intervals": [
+            {"interval_number": "1", "interval_distance": 500, "interval_time": "1:40.0",
+             "interval_pace": "1:40.0", "rate": 30, "rest_time": "1:00"},
+            {"interval_number": "2", "interval_distance": 1000, "interval_time": "1:40.0",
+             "interval_pace": "1:40.0", "rate": 30},
+        ],
+    })
+
+
+def _contents(path):
+    wb = openpyxl.load_workbook(path)
+    return {name: [list(row) for row in wb[name].iter_rows(values_only=True)] for name in wb.sheetnames}
+
+
+@pytest.mark.parametrize("writer", ["openpyxl", "xlsxwriter"])
+def test_regular_report(reader, workout, tmp_path, writer):
+    output = tmp_path / "report.xlsx"
+    reader.create_excel_report(workout.summary, workout.splits, str(output), "Jane", writer)
+
+    sheets = _contents(output)
+    assert list(sheets) == ["Summary", "Jane Split Breakdown"]
+    assert sheets["Summary"][0][0] == "Name"
+    assert sheets["Summary"][1][0] == "Jane"
+    assert sheets["Jane Split Breakdown"][0] == ["Split #", "Distance (m)", "Time", "Pace", "Rate (spm)", "HR", "Watts"]
+    assert sheets["Jane Split Breakdown"][1] == ["1", 500, "2:00.0", "2:00.0", 24, 148, 202.5]
+    assert sheets["Jane Split Breakdown"][2][5] is None
+
+
+def test_writers_produce_the_same_workbook(reader, workout, tmp_path):
+    for writer in ("openpyxl", "xlsxwriter"):
+        for name in ("Jane", "Jane", "Sam"):
+            reader.create_excel_report(workout.summary, workout.splits, str(tmp_path / f"{writer}.xlsx"), name, writer)
+
+    assert _contents(tmp_path / "openpyxl.xlsx") == _contents(tmp_path / "xlsxwriter.xlsx")
+
+
+def test_streaming_writer_appends_and_deduplicates_names(reader, workout, tmp_path):
+    output = tmp_path / "report.xlsx"
+    for _ in range(3):
+        reader.create_excel_report(workout.summary, workout.splits, str(output), "Jane", "xlsxwriter")
+
+    sheets = _contents(output)
+    assert [row[0] for row in sheets["Summary"][1:]] == ["Jane", "Jane 2", "Jane 3"]
+    assert list(sheets)[1:] == ["Jane Split Breakdown", "Jane 2 Split Breakdown", "Jane 3 Split Breakdown"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_streaming_writer_adds_new_summary_columns(reader, workout, interval_workout, tmp_path):
+    output = tmp_path / "report.xlsx"
+    reader.create_excel_report(workout.summary, workout.splits, str(output), "Jane", "xlsxwriter")
+    reader.create_interval_excel_report(interval_workout.summary, interval_workout.intervals, str(output),
+                                        "Sam", "xlsxwriter")
+
+    summary = _contents(output)["Summary"]
+    headers = summary[0]
+    assert "Total Intervals" in headers
+    # The earlier regular workout gets 'N/A' for the interval-only columns
+    assert summary[1][headers.index("Total Intervals")] == "N/A"
+    assert summary[2][headers.index("Total Intervals")] == 2
+    assert _contents(output)["Sam Interval Breakdown"][1][-1] == "1:00"
+
+
+def test_unknown_writer(reader, workout, tmp_path):
+    with pytest.raises(ValueError):
+        reader.create_excel_report(workout.summary, workout.splits, str(tmp_path / "report.xlsx"), "Jane", "csv")
@@ -0,0 +1,189 @@
+"""
+Tests for Google API retry handling and spreadsheet creation.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from erg_screen_reader import google_sheets_service
+from erg_screen_reader.google_sheets_service import (
+    MAX_RETRIES,
+    MAX_RETRY_AFTER,
+    GoogleSheetsService,
+    _execute,
+    _execute_create,
+    _retry_after,
+)
+from erg_screen_reader.models import Split, Summary
+
+
+def _http_error(status: int, retry_after=None) -> HttpError:
+    headers = {"status": str(status)}
+    if retry_after is not None:
+        headers["retry-after"] = retry_after
+    return HttpError(httplib2.Response(headers), b"{}")
+
+
+class FailingRequest:
+    """Request whose execute() fails with the given status, then succeeds after `failures` calls."""
+
+    def __init__(self, status: int, failures: int = MAX_RETRIES):
+        self.status = status
+        self.failures = failures
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise _http_error(self.status)
+        return {"spreadsheetId": "abc"}
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(google_sheets_service.time, "sleep", lambda delay: None)
+
+
+def test_retry_after_missing():
+    assert _retry_after(_http_error(503)) is None
+
+
+def test_retry_after_seconds():
+    assert _retry_after(_http_error(429, "7")) == 7.0
+    assert _retry_after(_http_error(429, "1.5")) == 1.5
+
+
+def test_retry_after_is_capped():
+    assert _retry_after(_http_error(429, "3600")) == MAX_RETRY_AFTER
+
+
+def test_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = _retry_after(_http_error(503, format_datetime(retry_at, usegmt=True)))
+    assert 25 <= delay <= 30
+
+
+def test_retry_after_past_http_date():
+    retry_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert _retry_after(_http_error(503, format_datetime(retry_at, usegmt=True))) == 0.0
+
+
+def test_retry_after_garbage():
+    assert _retry_after(_http_error(503, "soon")) is None
+
+
+def test_retry_waits_for_retry_after(monkeypatch):
+    delays = []
+    monkeypatch.setattr(google_sheets_service.time, "sleep", delays.append)
+
+    class RateLimitedRequest:
+        def __init__(self):
+            self.calls = 0
+
+        def execute(self):
+            self.calls += 1
+            if self.calls == 1:
+                raise _http_error(429, "30")
+            return {}
+
+    assert _execute(RateLimitedRequest()) == {}
+    assert delays == [30.0]
+
+
+def test_execute_retries_server_errors(no_sleep):
+    request = FailingRequest(503)
+    with pytest.raises(HttpError):
+        _execute(request)
+    assert request.calls == MAX_RETRIES
+
+
+def test_execute_returns_after_transient_errors(no_sleep):
+    request = FailingRequest(503, failures=2)
+    assert _execute(request) == {"spreadsheetId": "abc"}
+    assert request.calls == 3
+
+
+def test_execute_does_not_retry_client_errors(no_sleep):
+    request = FailingRequest(400)
+    with pytest.raises(HttpError):
+        _execute(request)
+    assert request.calls == 1
+
+
+def test_create_is_not_retried_after_server_errors(no_sleep):
+    # The spreadsheet may already exist; retrying would leave a duplicate
+    request = FailingRequest(503)
+    with pytest.raises(HttpError):
+        _execute_create(request)
+    assert request.calls == 1
+
+
+def test_create_is_retried_when_rate_limited(no_sleep):
+    request = FailingRequest(429)
+    with pytest.raises(HttpError):
+        _execute_create(request)
+    assert request.calls == MAX_RETRIES
+
+
+class FakeRequest:
+    """Request that returns a result or raises an error when executed."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+
+    def execute(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class FakeSpreadsheets:
+    """spreadsheets() resource recording create and batchUpdate bodies."""
+
+    def __init__(self, format_status=None):
+        self.format_status = format_status
+        self.created = None
+        self.batches = []
+
+    def create(self, body, fields):
+        self.created = body
+        return FakeRequest({"spreadsheetId": "abc"})
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.batches.append(body)
+        return FakeRequest({}, _http_error(self.format_status) if self.format_status else None)
+
+
+def _create_and_populate(spreadsheets):
+    service = GoogleSheetsService(credentials_path="unused.json")
+    service.service = type("FakeService", (), {"spreadsheets": lambda self: spreadsheets})()
+    summary = Summary(total_distance=1000, total_time="4:00.0", average_split="2:00.0", average_rate=24)
+    splits = [Split(split_number="1", split_distance=1000, split_time="4:00.0", split_pace="2:00.0", rate=24)]
+    return service.create_and_populate("Title", summary, splits, "Rower")
+
+
+def test_create_and_populate_formats_separately():
+    spreadsheets = FakeSpreadsheets()
+
+    assert _create_and_populate(spreadsheets) == "abc"
+    assert [sheet["properties"]["title"] for sheet in spreadsheets.created["sheets"]] == \
+        ["Summary", "Rower Split Breakdown"]
+    requests = spreadsheets.batches[0]["requests"]
+    assert any("autoResizeDimensions" in request for request in requests)
+    assert not any("updateCells" in request for request in requests)
+
+
+def test_create_and_populate_survives_format_errors(caplog):
+    spreadsheets = FakeSpreadsheets(format_status=400)
+
+    with caplog.at_level(logging.WARNING, logger="erg_screen_reader.google_sheets_service"):
+        assert _create_and_populate(spreadsheets) == "abc"
+
+    assert len(spreadsheets.batches) == 1
+    assert "Could not format spreadsheet abc" in caplog.text
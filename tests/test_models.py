@@ -0,0 +1,84 @@
+"""
+Tests for time parsing, watts calculation and split post-processing.
+"""
+
+import pytest
+
+from erg_screen_reader.models import (
+    ErgData,
+    IntervalWorkoutData,
+    calculate_watts,
+    time_to_seconds,
+)
+
+
+@pytest.mark.parametrize("time_str, expected", [
+    ("2:05.1", 125.1),
+    ("1:25", 85.0),
+    ("1:02:03.4", 3723.4),
+    ("45.25", 45.25),
+    ("7:30.0", 450.0),
+    (" 2:00.0 ", 120.0),
+])
+def test_time_to_seconds(time_str, expected):
+    assert time_to_seconds(time_str) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("time_str", ["", "abc", "2:05.1x", "1:2:3:4", None])
+def test_time_to_seconds_invalid(time_str):
+    assert time_to_seconds(time_str) == 0.0
+
+
+def test_calculate_watts():
+    # 2:00/500m is the standard 202.5W reference pace
+    assert calculate_watts("2:00.0", 500) == 202.5
+    assert calculate_watts("1:45.0", 500) == pytest.approx(2.80 / (105 / 500) ** 3, abs=0.05)
+
+
+@pytest.mark.parametrize("pace, distance", [("", 500), ("2:00.0", 0), ("2:00.0", -100), ("abc", 500)])
+def test_calculate_watts_invalid(pace, distance):
+    assert calculate_watts(pace, distance) is None
+
+
+def _summary(**extra):
+    return {
+        "total_distance": 1000,
+        "total_time": "4:00.0",
+        "average_split": "2:00.0",
+        "average_rate": 24,
+        **extra,
+    }
+
+
+def test_split_distances_and_average_watts():
+    data = ErgData.model_validate({
+        "summary": _summary(),
+        "splits": [
+            {"split_number": "1", "split_distance": 500, "split_time": "2:00.0",
+             "split_pace": "2:00.0", "rate": 24},
+            {"split_number": "2", "split_distance": 1000, "split_time": "2:00.0",
+             "split_pace": "2:00.0", "rate": 24},
+        ],
+    })
+
+    # Cumulative distances become per-split distances
+    assert [split._actual_split_distance for split in data.splits] == [500, 500]
+    assert [split.watts for split in data.splits] == [202.5, 202.5]
+    assert data.summary.average_watts == 202.5
+    assert data.model_dump()["splits"][0]["watts"] == 202.5
+
+
+def test_interval_watts_use_interval_distance():
+    data = IntervalWorkoutData.model_validate({
+        "summary": _summary(total_intervals=2, rest_time="1:00"),
+        "intervals": [
+            {"interval_number": "1", "interval_distance": 250, "interval_time": "0:50.0",
+             "interval_pace": "1:40.0", "rate": 30},
+            {"interval_number": "2", "interval_distance": 500, "interval_time": "0:50.0",
+             "interval_pace": "1:40.0", "rate": 30, "rest_time": "1:00"},
+        ],
+    })
+
+    expected = calculate_watts("1:40.0", 250)
+    assert [interval.watts for interval in data.intervals] == [expected, expected]
+    assert data.summary.average_watts == expected
@@ -0,0 +1,64 @@
+"""
+Tests for the web app's upload size limit.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from erg_screen_reader import web
+
+BOUNDARY = "testboundary"
+
+
+@pytest.fixture
+def client():
+    # Not entered as a context manager, so the lifespan (OpenAI and Google clients) doesn't run;
+    # oversize requests are answered before the endpoint
+    return TestClient(web.app)
+
+
+def _multipart(size: int) -> bytes:
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="erg.png"\r\n'
+        f"Content-Type: image/png\r\n\r\n"
+    ).encode() + b"x" * size + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _post(client, content):
+    return client.post(
+        "/upload",
+        content=content,
+        headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+
+
+def test_declared_length_over_limit(client):
+    response = _post(client, _multipart(web.MAX_UPLOAD_SIZE + 1))
+
+    assert response.status_code == 413
+    assert response.json() == {"success": False, "error": "File too large"}
+
+
+def test_streamed_body_over_limit(client):
+    body = _multipart(web.MAX_UPLOAD_SIZE + 1)
+
+    def chunks():
+        # A generator body is sent chunked, without a Content-Length
+        for start in range(0, len(body), 1024 * 1024):
+            yield body[start:start + 1024 * 1024]
+
+    response = _post(client, chunks())
+
+    assert response.status_code == 413
+    assert response.json() == {"success": False, "error": "File too large"}
+
+
+def test_body_within_limit_reaches_the_endpoint(client, monkeypatch):
+    # Without an API key the endpoint answers with its own error, after the body was accepted
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    web.validate_environment.cache_clear()
+
+    response = _post(client, _multipart(1024))
+
+    assert response.status_code != 413
+    assert response.json()["success"] is False